@@ -38,9 +38,9 @@ def status(request: Request) -> Dict[str, Any]:
             out["postgres_ok"] = True
     except Exception:
         try:
-            from cortex.utils.config import DATABASE_URL
+            from cortex.utils.config import database_url
             import psycopg2
-            fresh = psycopg2.connect(DATABASE_URL)
+            fresh = psycopg2.connect(database_url())
             fresh.cursor().execute("SELECT 1")
             fresh.close()
             out["postgres_ok"] = True
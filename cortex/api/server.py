@@ -10,6 +10,7 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import psycopg2
+import sqlparse
 from fastapi import FastAPI
 from pgvector.psycopg2 import register_vector
 from fastapi.middleware.cors import CORSMiddleware
@@ -21,7 +22,7 @@ from cortex.api.routes_consolidate import router as consolidate_router
 from cortex.api.routes_status import router as status_router
 from cortex.memory.store import MemoryStore
 from cortex.memory.vector_index import VectorIndex
-from cortex.utils.config import DATABASE_URL, EMBEDDING_MODEL, NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
+from cortex.utils.config import database_url, embedding_model, neo4j_uri, neo4j_user, neo4j_password
 
 # Path to schema (same as scripts/setup_rds.py)
 _SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "..", "memory", "db_schema.sql")
@@ -45,16 +46,7 @@ def _apply_schema_if_missing(conn) -> bool:
     # At least one table missing: run full schema (all statements use IF NOT EXISTS)
     with open(_SCHEMA_PATH) as f:
         sql_text = f.read()
-    lines = []
-    for line in sql_text.splitlines():
-        if "--" in line:
-            line = line[: line.index("--")].strip()
-        else:
-            line = line.strip()
-        if line:
-            lines.append(line)
-    full = " ".join(lines)
-    statements = [s.strip() + ";" for s in full.split(";") if s.strip()]
+    statements = [s for s in sqlparse.split(sqlparse.format(sql_text, strip_comments=True)) if s.strip()]
     cur = conn.cursor()
     try:
         for stmt in statements:
@@ -78,7 +70,7 @@ if not _log.handlers:
 
 
 def get_db_connection():
-    return psycopg2.connect(DATABASE_URL)
+    return psycopg2.connect(database_url())
 
 
 app = FastAPI(
@@ -129,7 +121,7 @@ def startup():
     app.state.vector_index = VectorIndex(db_connection=conn)
     try:
         from cortex.graph.graph_store import GraphStore
-        app.state.graph_store = GraphStore(uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD)
+        app.state.graph_store = GraphStore(uri=neo4j_uri(), user=neo4j_user(), password=neo4j_password())
     except Exception:
         app.state.graph_store = None
     try:
@@ -155,7 +147,7 @@ def startup():
     # Preload embedder so first add/query does not pay ~8s model load
     try:
         from cortex.utils.embeddings import get_embedder
-        get_embedder(EMBEDDING_MODEL)
+        get_embedder(embedding_model())
     except Exception:
         pass  # first request will load on demand
     # Optional background jobs (consolidation + graph metrics every 6h)
@@ -33,14 +33,10 @@ def _run_graph_metrics_job(app: Any) -> None:
         store = getattr(app.state, "memory_store", None)
         if not graph_store or not store:
             return
-        from cortex.graph.metrics import compute_graph_metrics
-        from uuid import UUID
-        metrics = compute_graph_metrics(graph_store)
-        if not metrics:
-            return
-        by_uuid = {UUID(mid): v for mid, v in metrics.items()}
-        store.set_graph_metrics_bulk(by_uuid)
-        _log.info("Graph metrics updated for %d memories.", len(by_uuid))
+        from cortex.graph.metrics import write_graph_metrics
+        n = write_graph_metrics(graph_store, store)
+        if n:
+            _log.info("Graph metrics updated for %d memories.", n)
     except Exception as e:
         _log.warning("Background graph metrics job failed: %s", e)
 
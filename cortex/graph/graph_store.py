@@ -11,16 +11,18 @@ TRAVERSE_TIMEOUT_SEC = float(os.environ.get("CORTEX_NEO4J_TRAVERSE_TIMEOUT", "2.
 
 
 class GraphStore:
-    def __init__(self, uri: str = "", user: str = "", password: str = ""):
+    def __init__(self, uri: str = "", user: str = "", password: str = "", **driver_kwargs: Any):
         self._uri = uri
         self._user = user
         self._password = password
+        # Passed through to GraphDatabase.driver (e.g. max_connection_pool_size, keep_alive)
+        self._driver_kwargs = driver_kwargs
         self._driver = None
 
     def _get_driver(self):
         if self._driver is None:
             from neo4j import GraphDatabase
-            self._driver = GraphDatabase.driver(self._uri, auth=(self._user, self._password))
+            self._driver = GraphDatabase.driver(self._uri, auth=(self._user, self._password), **self._driver_kwargs)
         return self._driver
 
     def close(self):
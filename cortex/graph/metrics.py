@@ -1,75 +1,104 @@
 """Graph metrics (PageRank, degree) for Memory nodes. Run in background; cache in graph_metrics table."""
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import logging
+import uuid
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 from cortex.graph.graph_store import GraphStore
 
+_log = logging.getLogger("cortexos.graph")
 
-def compute_degree_per_memory(graph_store: GraphStore) -> Dict[str, int]:
-    """Return {memory_id: degree} for each Memory node (relationship count)."""
+
+def _project_gds(session: Any) -> Optional[str]:
+    """Project a temporary undirected graph of all nodes/relationships; returns its name, or None without GDS."""
+    name = f"cortex-metrics-{uuid.uuid4().hex[:12]}"
+    try:
+        session.run(
+            "CALL gds.graph.project($name, '*', {ALL: {type: '*', orientation: 'UNDIRECTED'}}) YIELD graphName",
+            name=name,
+        ).consume()
+    except Exception as e:
+        _log.debug("GDS projection unavailable, using Cypher metrics: %s", e)
+        return None
+    return name
+
+
+def iter_graph_metrics(graph_store: GraphStore) -> Iterator[Tuple[str, float, int]]:
+    """
+    Stream (memory_id, pagerank, degree) for each Memory node straight off the Neo4j result cursor, so callers can
+    write in chunks while rows are still arriving. PageRank is computed server-side by GDS when available (temporary
+    projection, dropped afterwards); otherwise it falls back to degree normalized by the max degree.
+    """
     driver = graph_store._get_driver()
-    out: Dict[str, int] = {}
     with driver.session() as session:
+        name = _project_gds(session)
+        if name is not None:
+            yielded = False
+            try:
+                result = session.run(
+                    """
+                    CALL gds.pageRank.stream($name, { maxIterations: 20, dampingFactor: 0.85 })
+                    YIELD nodeId, score
+                    WITH gds.util.asNode(nodeId) AS n, score
+                    WHERE n:Memory
+                    RETURN n.id AS mem_id, score, size([(n)--() | 1]) AS degree
+                    """,
+                    name=name,
+                )
+                for r in result:
+                    mid = r.get("mem_id")
+                    if mid:
+                        yielded = True
+                        yield str(mid), float(r.get("score") or 0), int(r.get("degree") or 0)
+                return
+            except Exception as e:
+                # Only fall back if nothing was emitted yet; otherwise callers would see rows twice
+                if yielded:
+                    raise
+                _log.warning("GDS metrics failed, using Cypher metrics: %s", e)
+            finally:
+                try:
+                    session.run("CALL gds.graph.drop($name, false) YIELD graphName", name=name).consume()
+                except Exception:
+                    pass
         result = session.run(
             """
             MATCH (m:Memory)
-            OPTIONAL MATCH (m)-[r]-()
-            WITH m, count(r) AS degree
-            RETURN m.id AS mem_id, degree
+            WITH max(size([(m)--() | 1])) AS max_deg
+            MATCH (m:Memory)
+            RETURN m.id AS mem_id, size([(m)--() | 1]) AS degree, max_deg
             """
         )
         for r in result:
             mid = r.get("mem_id")
             if mid:
-                out[str(mid)] = int(r.get("degree") or 0)
-    return out
+                degree = int(r.get("degree") or 0)
+                yield str(mid), degree / (r.get("max_deg") or 1), degree
 
 
-def compute_pagerank_memory(graph_store: GraphStore) -> Dict[str, float]:
+def compute_graph_metrics(graph_store: GraphStore) -> Dict[str, dict]:
     """
-    PageRank over Memory nodes. Uses GDS if a 'memory-graph' is projected; else fallback to degree-normalized.
-    Returns {memory_id: pagerank_score}.
+    Compute pagerank and degree for each Memory node (GDS when available, else Cypher degree + fallback pagerank).
+    Returns {memory_id: {"pagerank": float, "degree": int}}.
     """
-    driver = graph_store._get_driver()
-    with driver.session() as session:
-        try:
-            # GDS requires a projected graph; if not present, fall through to degree fallback
-            exists_result = session.run("CALL gds.graph.exists('memory-graph') YIELD exists")
-            rec = exists_result.single()
-            if rec and rec.get("exists"):
-                pr_result = session.run(
-                    """
-                    CALL gds.pageRank.stream('memory-graph', { maxIterations: 20, dampingFactor: 0.85 })
-                    YIELD nodeId, score
-                    RETURN gds.util.asNode(nodeId).id AS mem_id, score
-                    """
-                )
-                out = {str(r["mem_id"]): float(r.get("score") or 0) for r in pr_result if r.get("mem_id")}
-                if out:
-                    return out
-        except Exception:
-            pass
-    # Fallback: use degree as proxy (normalize 0-1 by max degree)
-    degree = compute_degree_per_memory(graph_store)
-    if not degree:
-        return {}
-    max_deg = max(degree.values()) or 1
-    return {mid: (d / max_deg) for mid, d in degree.items()}
+    return {mid: {"pagerank": pr, "degree": deg} for mid, pr, deg in iter_graph_metrics(graph_store)}
 
 
-def compute_graph_metrics(graph_store: GraphStore) -> Dict[str, dict]:
+def write_graph_metrics(graph_store: GraphStore, store: Any, chunk_size: int = 1000) -> int:
     """
-    Compute pagerank and degree for each Memory node.
-    Returns {memory_id: {"pagerank": float, "degree": int}}.
+    Stream metrics from Neo4j into the graph_metrics table, upserting every chunk_size rows so Postgres writes
+    overlap with Neo4j reads and only one chunk is held in memory. Returns the number of memories written.
     """
-    degree = compute_degree_per_memory(graph_store)
-    pagerank = compute_pagerank_memory(graph_store)
-    memory_ids = set(degree.keys()) | set(pagerank.keys())
-    out = {}
-    for mid in memory_ids:
-        out[mid] = {
-            "pagerank": pagerank.get(mid, 0.0),
-            "degree": degree.get(mid, 0),
-        }
-    return out
+    buf: Dict[str, dict] = {}
+    total = 0
+    for mid, pagerank, degree in iter_graph_metrics(graph_store):
+        buf[mid] = {"pagerank": pagerank, "degree": degree}
+        if len(buf) >= chunk_size:
+            store.set_graph_metrics_bulk(buf)
+            total += len(buf)
+            buf = {}
+    if buf:
+        store.set_graph_metrics_bulk(buf)
+        total += len(buf)
+    return total
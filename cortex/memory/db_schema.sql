@@ -31,6 +31,9 @@ CREATE INDEX IF NOT EXISTS idx_memories_type ON memories(type);
 CREATE INDEX IF NOT EXISTS idx_memories_embedding ON memories
     USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
 
+-- The half-precision index for quantized search (CORTEX_VECTOR_QUANTIZED=1) is opt-in and not created here:
+-- run scripts/setup_rds.py --halfvec-index (see halfvec_index_sql() in cortex/memory/vector_index.py).
+
 -- Optional: entity index for filtering (GIN on array)
 CREATE INDEX IF NOT EXISTS idx_memories_entities ON memories USING GIN(entities);
 
@@ -60,6 +60,11 @@ class Memory(MemoryBase):
     class Config:
         from_attributes = True
 
+    @property
+    def id_str(self) -> str:
+        """str(id) (retrieval keys candidates by string id); not cached, so model_copy(update={"id": ...}) stays correct."""
+        return str(self.id)
+
     def to_db_row(self) -> dict[str, Any]:
         """For insertion into Postgres. Embedding as list; DB uses vector type."""
         return {
@@ -2,14 +2,29 @@
 from __future__ import annotations
 
 import json
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Set
 from uuid import UUID
 
 import psycopg2
+from psycopg2.extras import execute_values
 
 from cortex.memory.schema import Memory, MemoryCreate, MemoryType, memory_from_row
 
 
+def _feedback_row(r: tuple) -> dict:
+    """feedback_logs (query, retrieved_memory_ids, used_memory_ids, reward) row -> dict with str ids."""
+    query, ret, used, reward = r
+    ret_ids = ret if isinstance(ret, list) else (json.loads(ret) if isinstance(ret, str) else [])
+    used_ids = used if isinstance(used, list) else (json.loads(used) if isinstance(used, str) else [])
+    # Normalize to str so UUID() and set membership work (e.g. if driver returns UUID from JSONB)
+    return {
+        "query": query or "",
+        "retrieved_memory_ids": [str(x) for x in ret_ids if x is not None],
+        "used_memory_ids": [str(x) for x in used_ids if x is not None],
+        "reward": float(reward or 0.5),
+    }
+
+
 class MemoryStore:
     """CRUD for atomic memories in Postgres."""
 
@@ -95,6 +110,43 @@ class MemoryStore:
         finally:
             cur.close()
 
+    def get_memories_bulk(self, memory_ids: Iterable[UUID]) -> List[Memory]:
+        """Fetch many memories in one round trip. Missing ids are omitted; order is not guaranteed."""
+        ids = list({str(mid) for mid in memory_ids})
+        if not ids:
+            return []
+        conn = self._conn_or_get()
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                "SELECT id, user_id, type, summary, raw_text, embedding, importance, emotion, created_at, last_used, usage_count, mvn_score, entities, source FROM memories WHERE id = ANY(%s::uuid[])",
+                (ids,),
+            )
+            rows = cur.fetchall()
+            colnames = [d[0] for d in cur.description]
+            return [memory_from_row(dict(zip(colnames, r))) for r in rows]
+        finally:
+            cur.close()
+
+    def embeddings_signature(self) -> str:
+        """
+        Cheap fingerprint of the memories table from aggregates only (row count, embedded-row count, latest
+        created/used, usage total); no per-row serialization or sort. Changes whenever rows are added, deleted,
+        embedded or used; for invalidating on-disk caches (callers add the embedding model to the key).
+        """
+        conn = self._conn_or_get()
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                """
+                SELECT count(*), count(embedding), max(created_at), max(last_used), coalesce(sum(usage_count), 0)
+                FROM memories
+                """
+            )
+            return "|".join(str(v) for v in cur.fetchone())
+        finally:
+            cur.close()
+
     def get_all_memory_summaries(self, limit: int = 50000) -> List[tuple[str, str]]:
         """Return (id, summary) for all memories, for BM25 index build. summary may be empty."""
         conn = self._conn_or_get()
@@ -142,6 +194,21 @@ class MemoryStore:
         finally:
             cur.close()
 
+    def get_user_memory_ids(self, user_id: UUID, limit: Optional[int] = None) -> Set[str]:
+        """Return ids (as str) of a user's memories without loading the rows (e.g. for BM25 user filtering)."""
+        conn = self._conn_or_get()
+        cur = conn.cursor()
+        try:
+            q = "SELECT id FROM memories WHERE user_id = %s"
+            params: list = [str(user_id)]
+            if limit is not None:
+                q += " ORDER BY created_at DESC LIMIT %s"
+                params.append(limit)
+            cur.execute(q, params)
+            return {str(r[0]) for r in cur.fetchall()}
+        finally:
+            cur.close()
+
     def update_usage(self, memory_id: UUID) -> None:
         """Increment usage_count and set last_used to now (for feedback/reflection)."""
         conn = self._conn_or_get()
@@ -218,22 +285,25 @@ class MemoryStore:
                 "SELECT query, retrieved_memory_ids, used_memory_ids, reward FROM feedback_logs ORDER BY created_at DESC LIMIT %s",
                 (limit,),
             )
-            rows = cur.fetchall()
-            out = []
-            for r in rows:
-                query, ret, used, reward = r
-                ret_ids = ret if isinstance(ret, list) else (json.loads(ret) if isinstance(ret, str) else [])
-                used_ids = used if isinstance(used, list) else (json.loads(used) if isinstance(used, str) else [])
-                # Normalize to str so UUID() and set membership work (e.g. if driver returns UUID from JSONB)
-                ret_ids = [str(x) for x in ret_ids if x is not None]
-                used_ids = [str(x) for x in used_ids if x is not None]
-                out.append({
-                    "query": query or "",
-                    "retrieved_memory_ids": ret_ids,
-                    "used_memory_ids": used_ids,
-                    "reward": float(reward or 0.5),
-                })
-            return out
+            return [_feedback_row(r) for r in cur.fetchall()]
+        finally:
+            cur.close()
+
+    def iter_feedback_logs(self, limit: int = 5000, itersize: int = 1000) -> Iterator[dict]:
+        """
+        Stream feedback_logs (same dicts as get_feedback_logs) through a server-side cursor, fetching itersize rows per
+        round trip, so callers can process logs in chunks without holding all of them. Runs inside the current transaction.
+        """
+        conn = self._conn_or_get()
+        cur = conn.cursor(name="cortex_feedback_logs")
+        cur.itersize = itersize
+        try:
+            cur.execute(
+                "SELECT query, retrieved_memory_ids, used_memory_ids, reward FROM feedback_logs ORDER BY created_at DESC LIMIT %s",
+                (limit,),
+            )
+            for r in cur:
+                yield _feedback_row(r)
         finally:
             cur.close()
 
@@ -273,24 +343,29 @@ class MemoryStore:
         finally:
             cur.close()
 
-    def set_graph_metrics_bulk(self, metrics: Dict[UUID, dict]) -> None:
-        """Upsert graph_metrics. metrics: {memory_id: {pagerank, degree}}. No-op if graph_metrics table does not exist."""
+    def set_graph_metrics_bulk(self, metrics: Dict[str, dict]) -> None:
+        """
+        Upsert graph_metrics. metrics: {memory_id: {pagerank, degree}}; ids as str (UUID keys also work), cast in SQL.
+        No-op if graph_metrics table does not exist.
+        """
         if not metrics:
             return
+        rows = [(str(mid), float(vals.get("pagerank", 0)), int(vals.get("degree", 0))) for mid, vals in metrics.items()]
         conn = self._conn_or_get()
         cur = conn.cursor()
         try:
-            for mid, vals in metrics.items():
-                pr = float(vals.get("pagerank", 0))
-                deg = int(vals.get("degree", 0))
-                cur.execute(
-                    """
-                    INSERT INTO graph_metrics (memory_id, pagerank, degree, updated_at)
-                    VALUES (%s, %s, %s, NOW())
-                    ON CONFLICT (memory_id) DO UPDATE SET pagerank = EXCLUDED.pagerank, degree = EXCLUDED.degree, updated_at = NOW()
-                    """,
-                    (str(mid), pr, deg),
-                )
+            # Multi-row VALUES: one statement per 1000 rows instead of one round trip per memory
+            execute_values(
+                cur,
+                """
+                INSERT INTO graph_metrics (memory_id, pagerank, degree, updated_at)
+                VALUES %s
+                ON CONFLICT (memory_id) DO UPDATE SET pagerank = EXCLUDED.pagerank, degree = EXCLUDED.degree, updated_at = NOW()
+                """,
+                rows,
+                template="(%s::uuid, %s, %s, NOW())",
+                page_size=1000,
+            )
             conn.commit()
         except Exception as e:
             if "graph_metrics" in str(e) or "does not exist" in str(e).lower():
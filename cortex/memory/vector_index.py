@@ -5,18 +5,37 @@ from typing import List, Optional
 from uuid import UUID
 
 from cortex.memory.schema import Memory, memory_from_row
+from cortex.utils.config import embedding_dim, vector_quantized, vector_rerank_factor
+
+# Quantized search: scan a half-precision (halfvec) index for a shortlist of k * vector_rerank_factor() rows,
+# then rerank the shortlist with full-precision cosine. Needs pgvector >= 0.7 and idx_memories_embedding_half.
+
+
+def halfvec_index_sql() -> str:
+    """
+    Opt-in DDL for the quantized search index (not in db_schema.sql, so default installs do not maintain it);
+    run by scripts/setup_rds.py --halfvec-index or when CORTEX_VECTOR_QUANTIZED=1 at setup time.
+    """
+    return (
+        "CREATE INDEX IF NOT EXISTS idx_memories_embedding_half ON memories "
+        f"USING ivfflat ((embedding::halfvec({embedding_dim()})) halfvec_cosine_ops) WITH (lists = 100)"
+    )
+
+_COLUMNS = "id, user_id, type, summary, raw_text, embedding, importance, emotion, created_at, last_used, usage_count, mvn_score, entities, source"
 
 
 class VectorIndex:
     """Vector similarity search over memory embeddings using pgvector."""
 
-    def __init__(self, db_connection=None, get_connection=None):
+    def __init__(self, db_connection=None, get_connection=None, quantized: Optional[bool] = None):
         """
         db_connection: optional sync connection (e.g. psycopg2).
         get_connection: optional callable that returns a connection (for context managers).
+        quantized: use the halfvec shortlist + float rerank search (default: CORTEX_VECTOR_QUANTIZED=1).
         """
         self._conn = db_connection
         self._get_conn = get_connection
+        self._quantized = vector_quantized() if quantized is None else quantized
 
     def _conn_or_get(self):
         if self._conn is not None:
@@ -39,25 +58,38 @@ class VectorIndex:
         conn = self._conn_or_get()
         cur = conn.cursor()
         try:
-            # pgvector: <=> is cosine distance; 1 - distance = similarity
-            # Cast %s to vector so Postgres gets vector type (not numeric[])
-            q = """
-                SELECT id, user_id, type, summary, raw_text, embedding, importance, emotion,
-                       created_at, last_used, usage_count, mvn_score, entities, source,
-                       1 - (embedding <=> %s::vector) AS score
-                FROM memories
-                WHERE embedding IS NOT NULL
-            """
-            params: list = [query_embedding]
+            where = "embedding IS NOT NULL"
+            filter_params: list = []
             if user_id is not None:
-                q += " AND user_id = %s"
-                params.append(str(user_id))
+                where += " AND user_id = %s"
+                filter_params.append(str(user_id))
             if type_filter is not None:
-                q += " AND type = %s"
-                params.append(type_filter)
-            q += " ORDER BY embedding <=> %s::vector LIMIT %s"
-            params.append(query_embedding)
-            params.append(k)
+                where += " AND type = %s"
+                filter_params.append(type_filter)
+            # pgvector: <=> is cosine distance; 1 - distance = similarity
+            # Cast %s to vector so Postgres gets vector type (not numeric[])
+            if self._quantized:
+                # Shortlist on the half-precision index (half the bytes scanned), then exact cosine on the shortlist
+                half = f"halfvec({embedding_dim()})"
+                q = f"""
+                    SELECT {_COLUMNS}, 1 - (embedding <=> %s::vector) AS score
+                    FROM (
+                        SELECT {_COLUMNS} FROM memories
+                        WHERE {where}
+                        ORDER BY embedding::{half} <=> %s::{half}
+                        LIMIT %s
+                    ) shortlist
+                    ORDER BY embedding <=> %s::vector LIMIT %s
+                """
+                params = [query_embedding, *filter_params, query_embedding, k * vector_rerank_factor(), query_embedding, k]
+            else:
+                q = f"""
+                    SELECT {_COLUMNS}, 1 - (embedding <=> %s::vector) AS score
+                    FROM memories
+                    WHERE {where}
+                    ORDER BY embedding <=> %s::vector LIMIT %s
+                """
+                params = [query_embedding, *filter_params, query_embedding, k]
             cur.execute(q, params)
             rows = cur.fetchall()
             colnames = [d[0] for d in cur.description]
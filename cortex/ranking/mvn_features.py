@@ -2,23 +2,29 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 import math
 
+import numpy as np
+
 from cortex.memory.schema import Memory
 from cortex.retrieval.candidate_builder import Candidate
+from cortex.retrieval.hybrid_search import FEATURE_INDEX
 from cortex.utils.embeddings import embed
 
 
-def _cosine_sim(a: List[float], b: List[float]) -> float:
-    if len(a) != len(b) or not a:
+def _cosine_sim(a, b) -> float:
+    """Cosine of two vectors (lists or ndarrays; arrays are used without copying). 0.0 if empty, mismatched or zero."""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    if a.shape != b.shape or a.size == 0:
         return 0.0
-    dot = sum(x * y for x, y in zip(a, b))
-    na = sum(x * x for x in a) ** 0.5
-    nb = sum(x * x for x in b) ** 0.5
+    na = np.linalg.norm(a)
+    nb = np.linalg.norm(b)
     if na == 0 or nb == 0:
         return 0.0
-    return dot / (na * nb)
+    return float(a @ b / (na * nb))
 
 
 def _recency_score(created_at: Optional[datetime], last_used: Optional[datetime], lambda_decay: float = 0.1) -> float:
@@ -49,11 +55,15 @@ def build_mvn_features(
     pagerank: float = 0.0,
     graph_distance: float = 0.0,
     intent_type: int = 0,
+    similarity: Optional[float] = None,
 ) -> List[float]:
     """
     Build feature vector for MVN. Either pass Candidate (with .memory and .similarity etc) or Memory.
+    similarity: precomputed query-memory cosine for the Memory path (e.g. from a batched matmul); skips embed/cosine.
     Returns list of floats: similarity, recency, importance, usage_count, pagerank, entity_overlap,
-    emotion_intensity (placeholder), topic_match (same as similarity), novelty (placeholder), graph_distance.
+    emotion_intensity (placeholder), topic_match (same as similarity), novelty (placeholder), graph_distance,
+    intent. RRF is not an MVN input: training samples are built from bare memories with no ranks, so it is only
+    used as the retrieval sort tiebreak.
     """
     if candidate is not None:
         mem = candidate.memory
@@ -65,9 +75,11 @@ def build_mvn_features(
             mem = memory
     elif memory is not None:
         mem = memory
-        q_emb = query_embedding or embed(query)
-        mem_emb = mem.embedding
-        similarity = _cosine_sim(q_emb, mem_emb) if mem_emb else 0.0
+        if similarity is None:
+            # Explicit None/len checks: embeddings may be ndarrays, whose truth value is ambiguous
+            q_emb = query_embedding if query_embedding is not None and len(query_embedding) else embed(query)
+            mem_emb = mem.embedding
+            similarity = _cosine_sim(q_emb, mem_emb) if mem_emb is not None and len(mem_emb) else 0.0
         recency = _recency_score(mem.created_at, mem.last_accessed or getattr(mem, "last_used", None))
         importance = mem.importance or 0.5
         from cortex.ingestion.entity_parser import extract_entities
@@ -94,6 +106,52 @@ def build_mvn_features(
     ]
 
 
+def build_mvn_feature_matrix(
+    candidates: List[Candidate],
+    intent_type: int = 0,
+    features: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Column-wise equivalent of build_mvn_features(query, candidate=c, pagerank=c.pagerank, graph_distance=c.graph_score)
+    for all candidates at once. Returns float32 array of shape (len(candidates), build_mvn_feature_dim()).
+    features: optional hybrid feature matrix (rows aligned with candidates); columns are sliced from it instead of
+    read per candidate.
+    """
+    n = len(candidates)
+    out = np.zeros((n, build_mvn_feature_dim()), dtype=np.float32)
+    if n == 0:
+        return out
+    if features is not None:
+        similarity = features[:, FEATURE_INDEX["similarity"]]
+        recency = features[:, FEATURE_INDEX["temporal_score"]]
+        importance = features[:, FEATURE_INDEX["importance"]]
+        pagerank = features[:, FEATURE_INDEX["pagerank"]]
+        graph_distance = features[:, FEATURE_INDEX["graph_score"]]
+    else:
+        similarity = np.fromiter((c.similarity for c in candidates), dtype=np.float64, count=n)
+        recency = np.fromiter((c.recency or c.temporal_score for c in candidates), dtype=np.float64, count=n)
+        importance = np.fromiter((c.importance for c in candidates), dtype=np.float64, count=n)
+        pagerank = np.fromiter((c.pagerank for c in candidates), dtype=np.float64, count=n)
+        graph_distance = np.fromiter((c.graph_score for c in candidates), dtype=np.float64, count=n)
+    mems = [c.memory for c in candidates]
+    usage = np.fromiter(
+        ((getattr(m, "usage_count", 0) or getattr(m, "access_count", 0) or 0) for m in mems), dtype=np.float64, count=n
+    )
+    out[:, 0] = similarity
+    out[:, 1] = recency
+    out[:, 2] = importance
+    out[:, 3] = np.minimum(1.0, usage / 10.0)
+    out[:, 4] = pagerank
+    out[:, 5] = np.fromiter((c.entity_overlap for c in candidates), dtype=np.float64, count=n)
+    out[:, 6] = np.fromiter((0.5 if getattr(m, "emotion", None) else 0.0 for m in mems), dtype=np.float64, count=n)
+    out[:, 7] = similarity  # topic_match
+    out[:, 8] = 0.5  # novelty placeholder
+    out[:, 9] = graph_distance
+    out[:, 10] = float(intent_type) / 4.0
+    return out
+
+
+@lru_cache(maxsize=1)
 def build_mvn_feature_dim() -> int:
     """Return expected feature dimension (for model input_dim)."""
     return 11
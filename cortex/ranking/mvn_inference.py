@@ -3,15 +3,13 @@ from __future__ import annotations
 
 from typing import List, Optional
 
+import numpy as np
 import torch
 
-from cortex.ranking.mvn_features import build_mvn_features, build_mvn_feature_dim
+from cortex.ranking.mvn_features import build_mvn_feature_matrix
 from cortex.ranking.mvn_model import MVN
 from cortex.retrieval.candidate_builder import Candidate
-from cortex.retrieval.intent import detect_intent_simple
-
-
-INTENT_IDS = {"recall": 0, "reasoning": 1, "personal": 2, "knowledge": 3, "planning": 4}
+from cortex.retrieval.intent import detect_intent_id
 
 
 def score_candidates(
@@ -19,40 +17,44 @@ def score_candidates(
     candidates: List[Candidate],
     model: Optional[MVN] = None,
     device: Optional[str] = None,
+    features: Optional[np.ndarray] = None,
 ) -> List[Candidate]:
     """
     Build feature matrix for candidates, run MVN, attach mvn_score to each candidate.
     If model is None, leave mvn_score as None (pipeline will use simple score).
+    features: optional hybrid feature matrix from retrieve_candidates (rows aligned with candidates).
+    """
+    return score_candidates_batch([query], [candidates], model=model, device=device, features_list=[features])[0]
+
+
+def score_candidates_batch(
+    queries: List[str],
+    candidate_lists: List[List[Candidate]],
+    model: Optional[MVN] = None,
+    device: Optional[str] = None,
+    features_list: Optional[List[Optional[np.ndarray]]] = None,
+) -> List[List[Candidate]]:
+    """
+    score_candidates for several queries with a single MVN forward pass over the stacked (sum(N_i), F) matrix.
+    features_list: optional per-query hybrid feature matrices (aligned with candidate_lists).
     """
-    if not candidates:
-        return candidates
-    intent = detect_intent_simple(query)
-    intent_id = INTENT_IDS.get(intent, 0)
-    features_list = []
-    for c in candidates:
-        feats = build_mvn_features(
-            query,
-            candidate=c,
-            pagerank=c.pagerank,
-            graph_distance=c.graph_score,
-            intent_type=intent_id,
-        )
-        features_list.append(feats)
-    if not features_list:
-        return candidates
-    dim = build_mvn_feature_dim()
-    for f in features_list:
-        if len(f) != dim:
-            f.extend([0.0] * (dim - len(f)))
-    x = torch.tensor(features_list, dtype=torch.float32)
+    if model is None or not any(candidate_lists):
+        return candidate_lists
+    if features_list is None:
+        features_list = [None] * len(queries)
+    blocks = []
+    for query, candidates, features in zip(queries, candidate_lists, features_list):
+        intent_id = detect_intent_id(query)
+        blocks.append(build_mvn_feature_matrix(candidates, intent_type=intent_id, features=features))
+    x = torch.from_numpy(np.concatenate(blocks))
     if device:
         x = x.to(device)
-    if model is not None:
-        model.eval()
-        with torch.no_grad():
-            scores = model(x)
-        if device and next(model.parameters()).is_cuda:
-            scores = scores.cpu()
-        for i, c in enumerate(candidates):
-            c.mvn_score = float(scores[i].item())
-    return candidates
+    model.eval()
+    with torch.no_grad():
+        scores = model(x).cpu().tolist()
+    offset = 0
+    for candidates in candidate_lists:
+        for c, s in zip(candidates, scores[offset : offset + len(candidates)]):
+            c.mvn_score = float(s)
+        offset += len(candidates)
+    return candidate_lists
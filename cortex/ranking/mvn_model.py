@@ -1,6 +1,7 @@
 """Memory Value Network (MVN): 2-layer MLP predicting utility score 0-1."""
 from __future__ import annotations
 
+import copy
 from typing import Optional
 
 import torch
@@ -23,11 +24,23 @@ class MVN(nn.Module):
         return self.net(x).squeeze(-1)
 
 
+def quantize_mvn(model: nn.Module) -> nn.Module:
+    """CPU int8 dynamic-quantized copy of model (Linear weights int8, activations quantized per batch)."""
+    qmodel = copy.deepcopy(model).cpu().eval()
+    return torch.ao.quantization.quantize_dynamic(qmodel, {nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
 def load_mvn(path: Optional[str] = None, input_dim: int = 11, device: Optional[str] = None) -> MVN:
-    """Load MVN from checkpoint or create new."""
+    """Load MVN from checkpoint or create new. Quantized checkpoints load as a CPU-only int8 model."""
     model = MVN(input_dim=input_dim)
     if path:
-        state = torch.load(path, map_location="cpu")
+        # Safe loading for every checkpoint: quantized state_dicts hold only qint8/fp32 tensors, dtypes and tuples
+        state = torch.load(path, map_location="cpu", weights_only=True)
+        if isinstance(state, dict) and state.get("quantized"):
+            # Rebuild the quantized module structure so the packed int8 params line up
+            model = quantize_mvn(model)
+            model.load_state_dict(state["state_dict"])
+            return model
         model.load_state_dict(state.get("state_dict", state))
     if device:
         model = model.to(device)
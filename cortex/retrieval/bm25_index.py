@@ -2,49 +2,109 @@
 from __future__ import annotations
 
 import re
-from typing import List, Optional
-from uuid import UUID
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
 
-from rank_bm25 import BM25Okapi
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+")
 
 
 def tokenize(text: str) -> List[str]:
-    return re.findall(r"\w+", text.lower())
+    return _TOKEN_RE.findall(text.lower())
 
 
 class BM25Index:
-    """In-memory BM25 index over memory summaries. Rebuild when memories change or load from store."""
+    """
+    In-memory BM25 (Okapi) index over memory summaries. Rebuild when memories change or load from store.
+    Documents are tokenized one at a time straight into sparse (doc, term, count) arrays; the tokenized
+    corpus is never held in memory. Scoring matches rank_bm25.BM25Okapi (k1=1.5, b=0.75, epsilon=0.25).
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self._clear()
 
-    def __init__(self):
+    def _clear(self) -> None:
         self._doc_ids: List[str] = []
-        self._corpus: List[List[str]] = []
-        self._bm25: Optional[BM25Okapi] = None
+        self._doc_pos: Dict[str, int] = {}
+        self._vocab: Dict[str, int] = {}
+        # Doc-major CSR: doc i has terms _indices[_indptr[i]:_indptr[i+1]] with counts _counts[...]
+        self._indptr = array("q", [0])
+        self._indices = array("q")
+        self._counts = array("q")
+        self._doc_len = array("q")
+        self._postings: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
 
-    def add(self, memory_id: str, text: str) -> None:
+    def _append(self, memory_id: str, text: str) -> None:
+        counts = Counter(tokenize(text))
+        for term, n in counts.items():
+            self._indices.append(self._vocab.setdefault(term, len(self._vocab)))
+            self._counts.append(n)
+        self._indptr.append(len(self._indices))
+        self._doc_len.append(sum(counts.values()))
+        self._doc_pos.setdefault(memory_id, len(self._doc_ids))
         self._doc_ids.append(memory_id)
-        self._corpus.append(tokenize(text))
-        self._bm25 = None
+
+    def add(self, memory_id: str, text: str) -> None:
+        self._append(memory_id, text)
+        self._postings = None
 
     def build(self, doc_ids: List[str], texts: List[str]) -> None:
         """Replace index with given docs."""
-        self._doc_ids = list(doc_ids)
-        self._corpus = [tokenize(t) for t in texts]
-        self._bm25 = BM25Okapi(self._corpus) if self._corpus else None
+        self._clear()
+        for memory_id, text in zip(doc_ids, texts):
+            self._append(memory_id, text)
+
+    def _get_postings(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Term-major view (term_ptr, doc_idx, tf, idf, length norm), built lazily after build/add."""
+        if self._postings is None:
+            n_docs, n_terms = len(self._doc_ids), len(self._vocab)
+            terms = np.frombuffer(self._indices, dtype=np.int64)
+            tf = np.frombuffer(self._counts, dtype=np.int64).astype(np.float64)
+            doc_len = np.frombuffer(self._doc_len, dtype=np.int64).astype(np.float64)
+            docs = np.repeat(np.arange(n_docs), np.diff(np.frombuffer(self._indptr, dtype=np.int64)))
+            order = np.argsort(terms, kind="stable")
+            df = np.bincount(terms, minlength=n_terms)
+            term_ptr = np.concatenate(([0], np.cumsum(df)))
+            idf = np.log(n_docs - df + 0.5) - np.log(df + 0.5)
+            if n_terms:
+                idf[idf < 0] = self.epsilon * idf.mean()
+            avgdl = doc_len.mean() if n_docs and doc_len.sum() else 1.0
+            norm = self.k1 * (1 - self.b + self.b * doc_len / avgdl)
+            self._postings = (term_ptr, docs[order], tf[order], idf, norm)
+        return self._postings
+
+    def get_scores(self, q_tokens: List[str]) -> np.ndarray:
+        """BM25 score of every document for the tokenized query."""
+        term_ptr, post_docs, post_tf, idf, norm = self._get_postings()
+        scores = np.zeros(len(self._doc_ids))
+        for token in q_tokens:
+            t = self._vocab.get(token)
+            if t is None:
+                continue
+            lo, hi = term_ptr[t], term_ptr[t + 1]
+            docs, tf = post_docs[lo:hi], post_tf[lo:hi]
+            scores[docs] += idf[t] * (tf * (self.k1 + 1) / (tf + norm[docs]))
+        return scores
 
     def search(self, query: str, top_k: int = 50, user_doc_ids: Optional[set] = None) -> List[tuple[str, float]]:
         """
         Return list of (memory_id, score). user_doc_ids: optional set of ids to filter (e.g. by user).
         """
-        if not self._corpus:
+        if not self._doc_ids:
             return []
-        if self._bm25 is None:
-            self._bm25 = BM25Okapi(self._corpus)
         q_tokens = tokenize(query)
         if not q_tokens:
             return []
-        scores = self._bm25.get_scores(q_tokens)
-        out = [(self._doc_ids[i], float(scores[i])) for i in range(len(self._doc_ids))]
+        scores = self.get_scores(q_tokens)
         if user_doc_ids is not None:
-            out = [(mid, s) for mid, s in out if mid in user_doc_ids]
-        out.sort(key=lambda x: -x[1])
-        return out[:top_k]
+            idx = np.array(sorted(self._doc_pos[mid] for mid in user_doc_ids if mid in self._doc_pos), dtype=np.int64)
+        else:
+            idx = np.arange(len(self._doc_ids))
+        # Stable sort keeps index order among equal scores
+        top = idx[np.argsort(-scores[idx], kind="stable")[:top_k]]
+        return [(self._doc_ids[i], float(scores[i])) for i in top.tolist()]
@@ -2,13 +2,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
-from uuid import UUID
+from typing import List, Optional
+
+import numpy as np
 
 from cortex.memory.schema import Memory
+from cortex.retrieval.hybrid_search import FEATURE_INDEX
 
 
-@dataclass
+@dataclass(slots=True)
 class Candidate:
     """One candidate memory with features for ranking (MVN, reranker)."""
 
@@ -22,9 +24,10 @@ class Candidate:
     temporal_score: float = 0.0
     from_graph: bool = False
     graph_score: float = 0.0  # combined graph signal for reranker
+    rrf: float = 0.0  # reciprocal rank fusion of vector + BM25 ranks
     mvn_score: Optional[float] = None
     final_score: Optional[float] = None  # set by reranker
-    features: Optional[Dict[str, Any]] = None  # raw feature dict
+    row: Optional[int] = None  # row of this candidate in the hybrid feature matrix
 
     @property
     def score(self) -> float:
@@ -38,52 +41,54 @@ class Candidate:
         )
 
 
-def _normalize(x: float, lo: float, hi: float) -> float:
-    """Min-max normalize to [0,1]; if lo==hi return 0.5."""
-    if hi is None or lo is None or hi <= lo:
-        return 0.5
-    return max(0.0, min(1.0, (x - lo) / (hi - lo)))
+def _normalize(x: np.ndarray) -> np.ndarray:
+    """Min-max normalize column to [0,1]; if min==max return 0.5 everywhere."""
+    lo, hi = x.min(), x.max()
+    if hi <= lo:
+        return np.full_like(x, 0.5)
+    return np.clip((x - lo) / (hi - lo), 0.0, 1.0)
 
 
-def build_candidates(hybrid_results: List[tuple]) -> List[Candidate]:
+def build_candidates(memories: List[Memory], features: np.ndarray) -> List[Candidate]:
     """
-    hybrid_results: list of (Memory, features_dict) from hybrid_search.retrieve_candidates.
-    feats may include pagerank, degree from graph_metrics cache; graph_score = α1*pagerank + α2*degree (normalized), fallback 0.3 if from_graph when missing.
+    memories, features: output of hybrid_search.retrieve_candidates (pagerank/degree columns filled from graph_metrics cache).
+    graph_score = α1*pagerank + α2*degree (normalized), fallback 0.3 if from_graph when missing.
+    Writes graph_score back into features so downstream scoring can slice it as a column.
     """
+    if not memories:
+        return []
     alpha1, alpha2 = 0.6, 0.4  # weight pagerank vs degree
-    pr_vals = [feats.get("pagerank", 0.0) for _, feats in hybrid_results]
-    deg_vals = [feats.get("degree", 0) for _, feats in hybrid_results]
-    pr_lo, pr_hi = (min(pr_vals), max(pr_vals)) if pr_vals else (0.0, 1.0)
-    deg_lo, deg_hi = (min(deg_vals), max(deg_vals)) if deg_vals else (0, 1)
+    pr = features[:, FEATURE_INDEX["pagerank"]]
+    deg = features[:, FEATURE_INDEX["degree"]]
+    from_graph = features[:, FEATURE_INDEX["from_graph"]] > 0
+    if pr.max() > pr.min() or deg.max() > deg.min():
+        graph_score = alpha1 * _normalize(pr) + alpha2 * _normalize(deg)
+    else:
+        graph_score = np.where(from_graph, 0.3, 0.0)
+    features[:, FEATURE_INDEX["graph_score"]] = graph_score
 
-    out = []
-    for mem, feats in hybrid_results:
-        recency = feats.get("temporal_score", 0)
-        importance = feats.get("importance", mem.importance or 0.5)
-        sim = feats.get("similarity", 0)
-        bm25 = feats.get("bm25_score", 0)
-        from_graph = feats.get("from_graph", False)
-        pr = feats.get("pagerank", 0.0)
-        deg = feats.get("degree", 0)
-        if pr_hi > pr_lo or deg_hi > deg_lo:
-            npr = _normalize(pr, pr_lo, pr_hi)
-            ndeg = _normalize(float(deg), deg_lo, deg_hi)
-            graph_score = alpha1 * npr + alpha2 * ndeg
-        else:
-            graph_score = 0.3 if from_graph else 0.0
-        out.append(
-            Candidate(
-                memory=mem,
-                similarity=sim,
-                recency=recency,
-                importance=importance,
-                pagerank=pr,
-                entity_overlap=feats.get("entity_overlap", 0.0),
-                bm25_score=bm25,
-                temporal_score=recency,
-                from_graph=from_graph,
-                graph_score=graph_score,
-                features=feats,
-            )
+    # One slice per column instead of a dict lookup per candidate per feature
+    sim = features[:, FEATURE_INDEX["similarity"]].tolist()
+    bm25 = features[:, FEATURE_INDEX["bm25_score"]].tolist()
+    recency = features[:, FEATURE_INDEX["temporal_score"]].tolist()
+    importance = features[:, FEATURE_INDEX["importance"]].tolist()
+    rrf = features[:, FEATURE_INDEX["rrf"]].tolist()
+    pr_list = pr.tolist()
+    from_graph_list = from_graph.tolist()
+    graph_list = graph_score.tolist()
+    return [
+        Candidate(
+            memory=mem,
+            similarity=sim[i],
+            recency=recency[i],
+            importance=importance[i],
+            pagerank=pr_list[i],
+            bm25_score=bm25[i],
+            temporal_score=recency[i],
+            from_graph=from_graph_list[i],
+            graph_score=graph_list[i],
+            rrf=rrf[i],
+            row=i,
         )
-    return out
+        for i, mem in enumerate(memories)
+    ]
@@ -4,17 +4,40 @@ from __future__ import annotations
 import math
 import time
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING, List, Optional, Set
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from uuid import UUID
 
+import numpy as np
+
+from cortex.ingestion.entity_parser import extract_entities
 from cortex.utils.embeddings import embed
 
 if TYPE_CHECKING:
     from cortex.graph.graph_store import GraphStore
+    from cortex.memory.schema import Memory
     from cortex.memory.store import MemoryStore
     from cortex.memory.vector_index import VectorIndex
     from cortex.retrieval.bm25_index import BM25Index
 
+# Column layout of the candidate feature matrix (one row per candidate memory).
+# pagerank/degree are filled by the pipeline from graph_metrics; graph_score by build_candidates.
+FEATURE_COLUMNS = (
+    "similarity",
+    "bm25_score",
+    "from_graph",
+    "temporal_score",
+    "importance",
+    "pagerank",
+    "degree",
+    "graph_score",
+    "rrf",
+)
+FEATURE_INDEX: Dict[str, int] = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+
+# Reciprocal Rank Fusion constant: rrf = sum over sources of 1 / (RRF_K + rank)
+RRF_K = 60
+
 
 def temporal_score(created_at: Optional[datetime], last_used: Optional[datetime], lambda_decay: float = 0.1) -> float:
     """Exponential time decay."""
@@ -28,6 +51,33 @@ def temporal_score(created_at: Optional[datetime], last_used: Optional[datetime]
     return math.exp(-lambda_decay * max(0, delta_days))
 
 
+@lru_cache(maxsize=2048)
+def _query_entities(query: str) -> Tuple[str, ...]:
+    """extract_entities(query), memoized per query string (tuple so the cached value cannot be mutated)."""
+    return tuple(extract_entities(query))
+
+
+def _epoch_seconds(t: Optional[datetime]) -> float:
+    """POSIX seconds for t (naive treated as UTC); NaN if missing."""
+    if t is None:
+        return math.nan
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=timezone.utc)
+    return t.timestamp()
+
+
+def temporal_scores(memories: List["Memory"], lambda_decay: float = 0.1) -> np.ndarray:
+    """Vectorized temporal_score for many memories: one clock read and one np.exp over all of them."""
+    ts = np.fromiter(
+        (_epoch_seconds(m.last_accessed or m.last_used or m.created_at) for m in memories),
+        dtype=np.float64,
+        count=len(memories),
+    )
+    missing = np.isnan(ts)
+    delta_days = (datetime.now(timezone.utc).timestamp() - np.where(missing, 0.0, ts)) / 86400.0
+    return np.where(missing, 0.5, np.exp(-lambda_decay * np.clip(delta_days, 0.0, None)))
+
+
 def retrieve_candidates(
     query: str,
     user_id: Optional[UUID],
@@ -39,76 +89,92 @@ def retrieve_candidates(
     top_k2: int = 30,
     merge_cap: int = 100,
     timings: Optional[dict] = None,
-) -> List[tuple]:
+    query_embedding: Optional[List[float]] = None,
+) -> Tuple[List["Memory"], np.ndarray]:
     """
-    Union of vector search, BM25 search, and graph expansion. Returns list of (Memory, features_dict).
-    features_dict includes: similarity, bm25_score, temporal_score, from_graph, etc.
+    Union of vector search, BM25 search, and graph expansion, capped at merge_cap.
+    Returns (memories, features) where features is a float64 matrix of shape (len(memories), len(FEATURE_COLUMNS));
+    row i holds similarity, bm25_score, from_graph, temporal_score, importance, rrf for memories[i] (see FEATURE_INDEX).
+    rrf is the Reciprocal Rank Fusion of the vector and BM25 rankings (scale-free, unlike similarity vs bm25_score).
     If timings dict is provided, fills embed_ms, vector_ms, bm25_ms, graph_ms.
+    query_embedding: precomputed embedding of query (e.g. from a batched embed call); skips embedding here.
     """
-    # Entity names from query (simple: words that could be entities)
-    from cortex.ingestion.entity_parser import extract_entities
-    query_entities = extract_entities(query)
-    memory_ids_seen: Set[str] = set()
-    candidates: List[tuple] = []  # (memory, features)
+    features = np.zeros((merge_cap, len(FEATURE_COLUMNS)), dtype=np.float64)
+    memories: List["Memory"] = []
+    row_of: Dict[str, int] = {}  # memory id -> row in features
+    sim_col = FEATURE_INDEX["similarity"]
+    bm25_col = FEATURE_INDEX["bm25_score"]
+    graph_col = FEATURE_INDEX["from_graph"]
+    rrf_col = FEATURE_INDEX["rrf"]
 
     # 1) Embed + vector search
     t0 = time.perf_counter()
-    q_emb = embed(query)
+    q_emb = query_embedding if query_embedding is not None else embed(query)
     if timings is not None:
         timings["embed_ms"] = round((time.perf_counter() - t0) * 1000, 2)
     t1 = time.perf_counter()
     vec_results = vector_index.search(q_emb, user_id=user_id, k=top_k1)
     if timings is not None:
         timings["vector_ms"] = round((time.perf_counter() - t1) * 1000, 2)
-    for mem, sim in vec_results:
-        memory_ids_seen.add(str(mem.id))
-        candidates.append((mem, {"similarity": sim, "bm25_score": 0.0, "from_graph": False}))
+    for rank, (mem, sim) in enumerate(vec_results, start=1):
+        if len(memories) >= merge_cap:
+            break
+        row_of[mem.id_str] = len(memories)
+        features[len(memories), sim_col] = sim
+        features[len(memories), rrf_col] = 1.0 / (RRF_K + rank)
+        memories.append(mem)
 
     # 2) BM25
     if bm25_index is not None:
         t2 = time.perf_counter()
-        user_set = None
-        if user_id:
-            user_mems = store.get_user_memories(user_id, limit=5000)
-            user_set = {str(m.id) for m in user_mems}
-        for mid, bm25_s in bm25_index.search(query, top_k=top_k2, user_doc_ids=user_set):
-            if mid in memory_ids_seen:
-                for i, (m, feats) in enumerate(candidates):
-                    if str(m.id) == mid:
-                        feats["bm25_score"] = bm25_s
-                        break
+        user_set = store.get_user_memory_ids(user_id) if user_id else None
+        for rank, (mid, bm25_s) in enumerate(bm25_index.search(query, top_k=top_k2, user_doc_ids=user_set), start=1):
+            row = row_of.get(mid)
+            if row is not None:
+                features[row, bm25_col] = bm25_s
+                features[row, rrf_col] += 1.0 / (RRF_K + rank)
+                continue
+            if len(memories) >= merge_cap:
                 continue
-            memory_ids_seen.add(mid)
             mem = store.get_memory(UUID(mid))
             if mem:
-                candidates.append((mem, {"similarity": 0.0, "bm25_score": bm25_s, "from_graph": False}))
+                row_of[mid] = len(memories)
+                features[len(memories), bm25_col] = bm25_s
+                features[len(memories), rrf_col] = 1.0 / (RRF_K + rank)
+                memories.append(mem)
         if timings is not None:
             timings["bm25_ms"] = round((time.perf_counter() - t2) * 1000, 2)
     elif timings is not None:
         timings["bm25_ms"] = 0
 
     # 3) Graph expansion
-    if graph_store is not None and query_entities:
+    # Entity names from query (simple: words that could be entities); only needed for graph expansion
+    query_entities = list(_query_entities(query)) if graph_store is not None else []
+    if query_entities:
         t3 = time.perf_counter()
         graph_ids = graph_store.traverse(query_entities, depth=2)
         if timings is not None:
             timings["graph_ms"] = round((time.perf_counter() - t3) * 1000, 2)
         for mid in graph_ids:
-            if mid in memory_ids_seen:
-                for i, (m, feats) in enumerate(candidates):
-                    if str(m.id) == mid:
-                        feats["from_graph"] = True
-                        break
+            row = row_of.get(mid)
+            if row is not None:
+                features[row, graph_col] = 1.0
+                continue
+            if len(memories) >= merge_cap:
                 continue
-            memory_ids_seen.add(mid)
             mem = store.get_memory(UUID(mid))
             if mem and (user_id is None or str(mem.user_id) == str(user_id)):
-                candidates.append((mem, {"similarity": 0.0, "bm25_score": 0.0, "from_graph": True}))
+                row_of[mid] = len(memories)
+                features[len(memories), graph_col] = 1.0
+                memories.append(mem)
     elif timings is not None:
         timings["graph_ms"] = 0
 
-    # Cap and add temporal score
-    for mem, feats in candidates[:merge_cap]:
-        feats["temporal_score"] = temporal_score(mem.created_at, mem.last_accessed or mem.last_used)
-        feats["importance"] = mem.importance or 0.5
-    return candidates[:merge_cap]
+    # Add temporal score and importance
+    features = features[: len(memories)]
+    if memories:
+        features[:, FEATURE_INDEX["temporal_score"]] = temporal_scores(memories)
+        features[:, FEATURE_INDEX["importance"]] = np.fromiter(
+            (m.importance or 0.5 for m in memories), dtype=np.float64, count=len(memories)
+        )
+    return memories, features
@@ -2,9 +2,13 @@
 from __future__ import annotations
 
 import re
-from typing import Literal
+from functools import lru_cache
+from typing import Dict, Literal, Tuple
 
 IntentType = Literal["recall", "reasoning", "personal", "knowledge", "planning"]
+# Position is the intent id used as an MVN feature (intent / 4)
+INTENT_TYPES: Tuple[IntentType, ...] = ("recall", "reasoning", "personal", "knowledge", "planning")
+INTENT_IDS: Dict[str, int] = {name: i for i, name in enumerate(INTENT_TYPES)}
 
 
 def detect_intent_simple(query: str) -> IntentType:
@@ -19,3 +23,9 @@ def detect_intent_simple(query: str) -> IntentType:
     if re.search(r"\b(plan|schedule|next|tomorrow|will i)\b", q):
         return "planning"
     return "knowledge"
+
+
+@lru_cache(maxsize=4096)
+def detect_intent_id(query: str) -> int:
+    """Intent id (index into INTENT_TYPES) for query; memoized since the same queries/summaries recur in training and eval."""
+    return INTENT_IDS[detect_intent_simple(query)]
@@ -2,14 +2,18 @@
 from __future__ import annotations
 
 import time
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, List, Optional, Tuple
 from uuid import UUID
 
+import numpy as np
+
 from cortex.ranking.mvn_inference import score_candidates as mvn_score_candidates
+from cortex.ranking.mvn_inference import score_candidates_batch as mvn_score_candidates_batch
 from cortex.ranking.reranker import rerank
 from cortex.retrieval.candidate_builder import Candidate, build_candidates
-from cortex.retrieval.hybrid_search import retrieve_candidates
+from cortex.retrieval.hybrid_search import FEATURE_INDEX, retrieve_candidates
 from cortex.retrieval.intent import detect_intent_simple
+from cortex.utils.embeddings import embed
 
 if TYPE_CHECKING:
     from cortex.graph.graph_store import GraphStore
@@ -18,27 +22,25 @@ if TYPE_CHECKING:
     from cortex.ranking.mvn_model import MVN
     from cortex.retrieval.bm25_index import BM25Index
 
+# Final-score weights over [mvn, similarity, recency, importance, graph_score] when MVN is present ...
+_MVN_WEIGHTS = np.array([0.4, 0.2, 0.15, 0.15, 0.1])
+# ... and over [similarity, recency, importance, temporal_score, from_graph] otherwise (same as Candidate.score).
+_SIMPLE_WEIGHTS = np.array([0.4, 0.2, 0.2, 0.2, 0.1])
+_RERANK_POOL = 20
 
-def retrieve_with_hybrid(
+
+def _build_hybrid_candidates(
     query: str,
     user_id: Optional[UUID],
     vector_index: "VectorIndex",
     store: "MemoryStore",
-    bm25_index: Optional["BM25Index"] = None,
-    graph_store: Optional["GraphStore"] = None,
-    mvn_model: Optional["MVN"] = None,
-    k: int = 10,
-    use_intent: bool = True,
-    use_reranker: bool = True,
-    rerank_top_k: int = 5,
-    timings: Optional[dict] = None,
-) -> List[Candidate]:
-    """
-    Run hybrid retrieval: candidates -> MVN scoring (if model) -> rerank -> return top-k.
-    Ranking formula when MVN present: 0.4*MVN + 0.2*similarity + 0.15*recency + 0.15*importance + 0.1*graph.
-    If timings dict is provided, fills embed_ms, vector_ms, bm25_ms, graph_ms, build_ms, mvn_ms, rerank_ms.
-    """
-    raw = retrieve_candidates(
+    bm25_index: Optional["BM25Index"],
+    graph_store: Optional["GraphStore"],
+    timings: Optional[dict],
+    query_embedding: Optional[List[float]] = None,
+) -> Tuple[List[Candidate], np.ndarray]:
+    """Hybrid candidates + graph_metrics merge + Candidate build. Returns (candidates, feature matrix)."""
+    memories, features = retrieve_candidates(
         query,
         user_id=user_id,
         vector_index=vector_index,
@@ -46,37 +48,55 @@ def retrieve_with_hybrid(
         bm25_index=bm25_index,
         graph_store=graph_store,
         timings=timings,
+        query_embedding=query_embedding,
     )
     # Merge graph_metrics (pagerank, degree) from cache for graph_score in build_candidates
-    memory_ids = [m.id for m, _ in raw]
-    graph_metrics = store.get_graph_metrics(memory_ids)
-    for m, feats in raw:
-        gm = graph_metrics.get(m.id, {})
-        feats["pagerank"] = gm.get("pagerank", 0.0)
-        feats["degree"] = gm.get("degree", 0)
+    graph_metrics = store.get_graph_metrics([m.id for m in memories])
+    for i, m in enumerate(memories):
+        gm = graph_metrics.get(m.id)
+        if gm:
+            features[i, FEATURE_INDEX["pagerank"]] = gm.get("pagerank", 0.0)
+            features[i, FEATURE_INDEX["degree"]] = gm.get("degree", 0)
     t_build = time.perf_counter()
-    candidates = build_candidates(raw)
+    candidates = build_candidates(memories, features)
     if timings is not None:
         timings["build_ms"] = round((time.perf_counter() - t_build) * 1000, 2)
-    # MVN scoring
-    t_mvn = time.perf_counter()
-    candidates = mvn_score_candidates(query, candidates, model=mvn_model)
-    if timings is not None:
-        timings["mvn_ms"] = round((time.perf_counter() - t_mvn) * 1000, 2)
-    # Combined score for sort when MVN used
-    for c in candidates:
-        if c.mvn_score is not None:
-            c.final_score = (
-                0.4 * c.mvn_score
-                + 0.2 * c.similarity
-                + 0.15 * (c.recency or c.temporal_score)
-                + 0.15 * c.importance
-                + 0.1 * c.graph_score
-            )
-        else:
-            c.final_score = c.score
-    candidates.sort(key=lambda x: x.final_score if x.final_score is not None else x.score, reverse=True)
-    top_20 = candidates[:20]
+    return candidates, features
+
+
+def _rank_candidates(
+    candidates: List[Candidate],
+    features: np.ndarray,
+    k: int,
+    use_reranker: bool,
+    rerank_top_k: int,
+    timings: Optional[dict],
+) -> List[Candidate]:
+    """Final score (MVN-weighted if scored) -> top max(k, 20) -> optional rerank -> top-k."""
+    if not candidates:
+        if timings is not None:
+            timings["rerank_ms"] = 0
+        return []
+    # Combined score for all candidates in one matrix-vector product over the feature columns
+    col = FEATURE_INDEX
+    if candidates[0].mvn_score is not None:
+        mvn = np.fromiter((c.mvn_score for c in candidates), dtype=np.float64, count=len(candidates))
+        score_matrix = np.column_stack(
+            (mvn, features[:, [col["similarity"], col["temporal_score"], col["importance"], col["graph_score"]]])
+        )
+        final = score_matrix @ _MVN_WEIGHTS
+    else:
+        cols = [col["similarity"], col["temporal_score"], col["importance"], col["temporal_score"], col["from_graph"]]
+        final = features[:, cols] @ _SIMPLE_WEIGHTS
+    for c, f in zip(candidates, final.tolist()):
+        c.final_score = f
+    # Partial selection of the top max(k, rerank pool), then a small sort (RRF breaks score ties)
+    n_top = min(len(candidates), max(k, _RERANK_POOL))
+    top_idx = np.argpartition(-final, n_top - 1)[:n_top] if n_top < len(candidates) else np.arange(len(candidates))
+    rrf = features[top_idx, col["rrf"]]
+    top_idx = top_idx[np.lexsort((-rrf, -final[top_idx]))]
+    candidates = [candidates[i] for i in top_idx.tolist()]
+    top_20 = candidates[:_RERANK_POOL]
     if use_reranker and top_20:
         t_rerank = time.perf_counter()
         out = rerank(top_20, top_k=min(rerank_top_k, k))
@@ -86,3 +106,68 @@ def retrieve_with_hybrid(
     if timings is not None:
         timings["rerank_ms"] = 0
     return candidates[:k]
+
+
+def retrieve_with_hybrid(
+    query: str,
+    user_id: Optional[UUID],
+    vector_index: "VectorIndex",
+    store: "MemoryStore",
+    bm25_index: Optional["BM25Index"] = None,
+    graph_store: Optional["GraphStore"] = None,
+    mvn_model: Optional["MVN"] = None,
+    k: int = 10,
+    use_intent: bool = True,
+    use_reranker: bool = True,
+    rerank_top_k: int = 5,
+    timings: Optional[dict] = None,
+    query_embedding: Optional[List[float]] = None,
+) -> List[Candidate]:
+    """
+    Run hybrid retrieval: candidates -> MVN scoring (if model) -> rerank -> return top-k.
+    Ranking formula when MVN present: 0.4*MVN + 0.2*similarity + 0.15*recency + 0.15*importance + 0.1*graph.
+    If timings dict is provided, fills embed_ms, vector_ms, bm25_ms, graph_ms, build_ms, mvn_ms, rerank_ms.
+    query_embedding: precomputed embedding of query; skips the embed step.
+    """
+    candidates, features = _build_hybrid_candidates(
+        query, user_id, vector_index, store, bm25_index, graph_store, timings, query_embedding=query_embedding
+    )
+    # MVN scoring
+    t_mvn = time.perf_counter()
+    candidates = mvn_score_candidates(query, candidates, model=mvn_model, features=features)
+    if timings is not None:
+        timings["mvn_ms"] = round((time.perf_counter() - t_mvn) * 1000, 2)
+    return _rank_candidates(candidates, features, k, use_reranker, rerank_top_k, timings)
+
+
+def retrieve_with_hybrid_batch(
+    queries: List[str],
+    user_ids: List[Optional[UUID]],
+    vector_index: "VectorIndex",
+    store: "MemoryStore",
+    bm25_index: Optional["BM25Index"] = None,
+    graph_store: Optional["GraphStore"] = None,
+    mvn_model: Optional["MVN"] = None,
+    k: int = 10,
+    use_reranker: bool = True,
+    rerank_top_k: int = 5,
+) -> List[List[Candidate]]:
+    """
+    retrieve_with_hybrid for many queries (e.g. eval / dataset construction). user_ids is aligned with queries.
+    Embeds all queries in one batched embed() call and scores all candidate pools with one MVN forward pass;
+    vector/BM25/graph lookups still run per query.
+    """
+    if not queries:
+        return []
+    query_embeddings = embed(list(queries))
+    pools = [
+        _build_hybrid_candidates(q, uid, vector_index, store, bm25_index, graph_store, None, query_embedding=q_emb)
+        for q, uid, q_emb in zip(queries, user_ids, query_embeddings)
+    ]
+    candidate_lists = [c for c, _ in pools]
+    features_list = [f for _, f in pools]
+    candidate_lists = mvn_score_candidates_batch(queries, candidate_lists, model=mvn_model, features_list=features_list)
+    return [
+        _rank_candidates(candidates, features, k, use_reranker, rerank_top_k, None)
+        for candidates, features in zip(candidate_lists, features_list)
+    ]
@@ -31,5 +31,5 @@ def run_retrieval_benchmark(
     start = time.perf_counter()
     candidates = retrieve_fn(query, user_id=user_id, k=k)
     latency_ms = (time.perf_counter() - start) * 1000
-    ids = [str(c.memory.id) for c in candidates] if hasattr(candidates[0], "memory") else [str(c.id) for c in candidates]
+    ids = [c.memory.id_str for c in candidates] if hasattr(candidates[0], "memory") else [c.id_str for c in candidates]
     return {"latency_ms": round(latency_ms, 2), "top_k_ids": ids}
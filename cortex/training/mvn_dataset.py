@@ -6,9 +6,7 @@ from uuid import UUID
 
 from cortex.ranking.mvn_features import build_mvn_features, build_mvn_feature_dim
 from cortex.retrieval.candidate_builder import Candidate
-from cortex.retrieval.intent import detect_intent_simple
-
-INTENT_IDS = {"recall": 0, "reasoning": 1, "personal": 2, "knowledge": 3, "planning": 4}
+from cortex.retrieval.intent import detect_intent_id
 
 
 def build_sample(
@@ -71,7 +69,7 @@ class MVNDataset:
                 positives = [retrieved[0]]
             if not negatives:
                 negatives = retrieved[1:2] or [retrieved[0]]
-            intent_id = INTENT_IDS.get(detect_intent_simple(query), 0)
+            intent_id = detect_intent_id(query)
             yield {
                 "query": query,
                 "pos_memory_id": positives[0],
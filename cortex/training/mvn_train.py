@@ -2,43 +2,87 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
+from itertools import chain, compress
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
+import numpy as np
 import torch
 import torch.nn as nn
-from torch.utils.data import DataLoader, Dataset
 
-from cortex.ranking.mvn_model import MVN
+from cortex.ranking.mvn_model import MVN, quantize_mvn
 from cortex.training.mvn_dataset import MVNDataset, build_mvn_feature_dim
 
+_log = logging.getLogger("cortexos.training")
 
-class MVNTrainDataset(Dataset):
-    """In-memory dataset of (pos_features, neg_features) for pairwise loss."""
+
+class MVNTrainDataset:
+    """
+    In-memory dataset of samples for pairwise loss: one positive row per sample plus its negatives, stored flat.
+    Each item pairs the positive with one negative drawn uniformly at random, so memory is O(positives + negatives)
+    rather than O(positives * negatives) and each epoch sees a fresh negative per sample.
+    Map-style (__len__/__getitem__), so it still works with torch DataLoader without importing torch.utils.data here.
+    """
 
     def __init__(self, samples: List[Dict], feature_dim: int):
         self.feature_dim = feature_dim
-        self.pairs: List[tuple] = []
-        for s in samples:
-            pos = s.get("pos_features")
-            negs = s.get("neg_features", [])
-            if not pos or not negs:
-                continue
-            for n in negs:
-                if len(pos) == feature_dim and len(n) == feature_dim:
-                    self.pairs.append((pos, n))
+        pos_list = [s.get("pos_features") or [] for s in samples]
+        neg_lists = [s.get("neg_features") or [] for s in samples]
+        flat_negs = list(chain.from_iterable(neg_lists))
+        # Shape checks as array ops: row lengths via map(len) (C loop), then boolean masks instead of per-row branches
+        pos_ok = np.fromiter(map(len, pos_list), dtype=np.int64, count=len(pos_list)) == feature_dim
+        neg_counts = np.fromiter(map(len, neg_lists), dtype=np.int64, count=len(neg_lists))
+        neg_ok = np.fromiter(map(len, flat_negs), dtype=np.int64, count=len(flat_negs)) == feature_dim
+        neg_sample = np.repeat(np.arange(len(samples)), neg_counts)
+        valid_negs = np.bincount(neg_sample[neg_ok], minlength=len(samples))
+        keep = pos_ok & (valid_negs > 0)
+        neg_keep = neg_ok & keep[neg_sample]
+        pos_rows = pos_list if keep.all() else list(compress(pos_list, keep))
+        neg_rows = flat_negs if neg_keep.all() else list(compress(flat_negs, neg_keep))
+        neg_lens = valid_negs[keep]
+        # Convert once here; sampling only indexes rows. Negatives of sample i are neg_t[neg_off[i] : neg_off[i] + neg_lens[i]]
+        self.pos_t = torch.from_numpy(np.asarray(pos_rows, dtype=np.float32).reshape(-1, feature_dim))
+        self.neg_t = torch.from_numpy(np.asarray(neg_rows, dtype=np.float32).reshape(-1, feature_dim))
+        self.neg_lens = torch.from_numpy(neg_lens.astype(np.int64))
+        self.neg_off = torch.cumsum(self.neg_lens, 0) - self.neg_lens
 
     def __len__(self):
-        return len(self.pairs)
+        return self.pos_t.shape[0]
 
     def __getitem__(self, i):
-        pos, neg = self.pairs[i]
-        return torch.tensor(pos, dtype=torch.float32), torch.tensor(neg, dtype=torch.float32)
+        j = int(torch.randint(0, int(self.neg_lens[i]), (1,)))
+        return self.pos_t[i], self.neg_t[int(self.neg_off[i]) + j]
+
+
+def _save_checkpoint(model: MVN, save_path: str) -> None:
+    """Save an int8 dynamic-quantized copy for CPU inference; the returned model stays fp32."""
+    Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+    torch.save({"state_dict": quantize_mvn(model).state_dict(), "quantized": True}, save_path)
+
+
+def _compile_for_training(model: MVN, n: int, batch_size: int, dim: int, amp: bool):
+    """
+    torch.compile the CUDA training forward (fused kernels + CUDA graphs). Returns (step_model, n_used): graphs need one
+    fixed batch shape, so the last partial batch is dropped each epoch (a fresh permutation rotates who is dropped).
+    Warm-up runs one dummy forward/backward so compilation/capture happens before the loop; falls back to eager.
+    """
+    bs = min(batch_size, n)
+    try:
+        compiled = torch.compile(model, mode="reduce-overhead", fullgraph=True)
+        with torch.autocast(device_type="cuda", dtype=torch.bfloat16, enabled=amp):
+            compiled(torch.zeros(2 * bs, dim, device=next(model.parameters()).device)).float().sum().backward()
+        model.zero_grad(set_to_none=True)
+    except Exception as e:
+        _log.warning("torch.compile unavailable for MVN training, using eager: %s", e)
+        model.zero_grad(set_to_none=True)
+        return model, n
+    return compiled, (n // bs) * bs
 
 
 def train_mvn(
-    train_samples: List[Dict],
+    train_samples: Union[List[Dict], MVNTrainDataset],
     feature_dim: Optional[int] = None,
     hidden_dim: int = 64,
     margin: float = 0.2,
@@ -47,36 +91,64 @@ def train_mvn(
     batch_size: int = 32,
     save_path: Optional[str] = None,
     device: Optional[str] = None,
+    use_amp: bool = False,
 ) -> MVN:
     """
-    train_samples: list of {"pos_features": [...], "neg_features": [[...], ...]}.
+    train_samples: list of {"pos_features": [...], "neg_features": [[...], ...]}, or an already built MVNTrainDataset
+    (features converted to tensors once by the caller; feature_dim must match).
+    use_amp: run the forward pass under bf16 autocast (CUDA only; no GradScaler needed for bf16).
+    On CUDA the forward is torch.compile'd (see _compile_for_training); the returned model is the plain MVN.
     Returns trained MVN model.
     """
-    dim = feature_dim or build_mvn_feature_dim()
-    dataset = MVNTrainDataset(train_samples, dim)
+    if isinstance(train_samples, MVNTrainDataset):
+        dataset = train_samples
+        dim = dataset.feature_dim
+    else:
+        dim = feature_dim or build_mvn_feature_dim()
+        dataset = MVNTrainDataset(train_samples, dim)
     if len(dataset) == 0:
         model = MVN(input_dim=dim, hidden_dim=hidden_dim)
         if save_path:
-            torch.save({"state_dict": model.state_dict()}, save_path)
+            _save_checkpoint(model, save_path)
         return model
-    loader = DataLoader(dataset, batch_size=batch_size, shuffle=True)
+    # Whole dataset lives in a few tensors: move them once, then slice shuffled index batches (no DataLoader/collate)
+    pos_t, neg_t, neg_off, neg_lens = dataset.pos_t, dataset.neg_t, dataset.neg_off, dataset.neg_lens
+    if device:
+        pos_t, neg_t = pos_t.to(device), neg_t.to(device)
+        neg_off, neg_lens = neg_off.to(device), neg_lens.to(device)
+    n = pos_t.shape[0]
     model = MVN(input_dim=dim, hidden_dim=hidden_dim)
     if device:
         model = model.to(device)
     optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+    amp = use_amp and pos_t.is_cuda
+    step_model, n_used = model, n
+    if pos_t.is_cuda:
+        step_model, n_used = _compile_for_training(model, n, batch_size, dim, amp)
+    targets: Dict[int, torch.Tensor] = {}  # all-ones ranking targets, cached per batch size
     for epoch in range(epochs):
-        total_loss = 0.0
-        for pos, neg in loader:
-            if device:
-                pos, neg = pos.to(device), neg.to(device)
-            score_pos = model(pos)
-            score_neg = model(neg)
-            loss = nn.functional.relu(margin - score_pos + score_neg).mean()
-            optimizer.zero_grad()
+        # Accumulate on device; one .item() (host sync) per epoch instead of per batch
+        total_loss = torch.zeros((), device=pos_t.device)
+        perm = torch.randperm(n, device=pos_t.device)
+        for i in range(0, n_used, batch_size):
+            idx = perm[i : i + batch_size]
+            # One uniformly sampled negative per positive, drawn for the whole batch at once
+            j = (torch.rand(idx.shape[0], device=idx.device) * neg_lens[idx]).long()
+            pos, neg = pos_t[idx], neg_t[neg_off[idx] + j]
+            # One forward pass over the concatenated [pos; neg] batch; scores upcast to fp32 before the margin loss
+            with torch.autocast(device_type="cuda", dtype=torch.bfloat16, enabled=amp):
+                scores = step_model(torch.cat([pos, neg], dim=0))
+            score_pos, score_neg = scores.float().chunk(2, dim=0)
+            target = targets.get(score_pos.shape[0])
+            if target is None:
+                target = targets[score_pos.shape[0]] = torch.ones_like(score_pos)
+            # mean(max(0, margin - (pos - neg))) as a single fused op
+            loss = nn.functional.margin_ranking_loss(score_pos, score_neg, target, margin=margin)
+            optimizer.zero_grad(set_to_none=True)
             loss.backward()
             optimizer.step()
-            total_loss += loss.item()
+            total_loss += loss.detach()
+        _log.debug("MVN epoch %d/%d loss_sum=%.4f", epoch + 1, epochs, total_loss.item())
     if save_path:
-        Path(save_path).parent.mkdir(parents=True, exist_ok=True)
-        torch.save({"state_dict": model.state_dict()}, save_path)
+        _save_checkpoint(model, save_path)
     return model
@@ -1,5 +1,6 @@
 """Config from environment. Load .env from project root before reading."""
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -14,16 +15,73 @@ def env(key: str, default: Optional[str] = None) -> Optional[str]:
     return os.environ.get(key, default)
 
 
+# Accessors read the environment on first call (not at import), then cache the value for the process.
+
+
 # Database
-DATABASE_URL: str = env("CORTEX_DATABASE_URL") or "postgresql://localhost/cortexos"
-REDIS_URL: str = env("CORTEX_REDIS_URL") or "redis://localhost:6379/0"
-NEO4J_URI: str = env("CORTEX_NEO4J_URI") or "bolt://localhost:7687"
-NEO4J_USER: str = env("CORTEX_NEO4J_USER") or "neo4j"
-NEO4J_PASSWORD: str = env("CORTEX_NEO4J_PASSWORD") or ""
+@lru_cache(maxsize=1)
+def database_url() -> str:
+    return env("CORTEX_DATABASE_URL") or "postgresql://localhost/cortexos"
+
+
+@lru_cache(maxsize=1)
+def redis_url() -> str:
+    return env("CORTEX_REDIS_URL") or "redis://localhost:6379/0"
+
+
+@lru_cache(maxsize=1)
+def neo4j_uri() -> str:
+    return env("CORTEX_NEO4J_URI") or "bolt://localhost:7687"
+
+
+@lru_cache(maxsize=1)
+def neo4j_user() -> str:
+    return env("CORTEX_NEO4J_USER") or "neo4j"
+
+
+@lru_cache(maxsize=1)
+def neo4j_password() -> str:
+    return env("CORTEX_NEO4J_PASSWORD") or ""
+
 
 # Embeddings
-EMBEDDING_MODEL: str = env("CORTEX_EMBEDDING_MODEL") or "sentence-transformers/all-MiniLM-L6-v2"
+@lru_cache(maxsize=1)
+def embedding_model() -> str:
+    return env("CORTEX_EMBEDDING_MODEL") or "sentence-transformers/all-MiniLM-L6-v2"
+
+
+@lru_cache(maxsize=1)
+def embedding_dim() -> int:
+    return int(env("CORTEX_EMBEDDING_DIM") or "384")  # must match db_schema.sql
+
+
+@lru_cache(maxsize=1)
+def embedding_cache_size() -> int:
+    return int(env("CORTEX_EMBEDDING_CACHE_SIZE") or "10000")  # LRU entries; 0 disables
+
+
+@lru_cache(maxsize=1)
+def torch_threads() -> int:
+    return int(env("CORTEX_TORCH_THREADS") or "0")  # CPU encode intra-op threads; 0 = all cores
+
+
+# Vector search (quantized: halfvec shortlist of k * rerank factor rows, then exact rerank)
+@lru_cache(maxsize=1)
+def vector_quantized() -> bool:
+    return (env("CORTEX_VECTOR_QUANTIZED") or "").strip() == "1"
+
+
+@lru_cache(maxsize=1)
+def vector_rerank_factor() -> int:
+    return int(env("CORTEX_VECTOR_RERANK_FACTOR") or "4")
+
 
 # API
-API_HOST: str = env("CORTEX_API_HOST") or "0.0.0.0"
-API_PORT: int = int(env("CORTEX_API_PORT") or "8000")
+@lru_cache(maxsize=1)
+def api_host() -> str:
+    return env("CORTEX_API_HOST") or "0.0.0.0"
+
+
+@lru_cache(maxsize=1)
+def api_port() -> int:
+    return int(env("CORTEX_API_PORT") or "8000")
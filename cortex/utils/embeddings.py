@@ -4,12 +4,52 @@ per ContexMemory.md. Dimension 384 for default model to match db_schema.sql.
 """
 from __future__ import annotations
 
-from typing import List, Union
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from cortex.utils.config import embedding_cache_size, torch_threads
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 
 # Default: small model, 384 dims. Override with CORTEX_EMBEDDING_MODEL env.
 _DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+_ENCODE_BATCH_SIZE = 64
 _embedder = None
 _model_name = None
+_threads_configured = False
+
+# LRU cache of embeddings keyed by (model name, 128-bit text hash); size from embedding_cache_size(), 0 disables it
+_cache: "OrderedDict[Tuple[str, bytes], np.ndarray]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_key(name: str, text: str) -> Tuple[str, bytes]:
+    # Non-cryptographic xxh3 is much cheaper per text; keys only need a low collision rate
+    if xxhash is not None:
+        return name, xxhash.xxh3_128_digest(text.encode("utf-8"))
+    return name, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _configure_threads(torch) -> None:
+    """Set torch thread pools once per process (interop threads can only be set before first parallel work)."""
+    global _threads_configured
+    if _threads_configured:
+        return
+    # Use all cores for CPU encode (torch may default to fewer intra-op threads)
+    torch.set_num_threads(torch_threads() or os.cpu_count() or 1)
+    try:
+        torch.set_num_interop_threads(2)
+    except RuntimeError:
+        pass  # already fixed by earlier torch work in this process
+    _threads_configured = True
 
 
 def get_embedder(model_name: str = ""):
@@ -17,14 +57,26 @@ def get_embedder(model_name: str = ""):
     name = model_name or _DEFAULT_MODEL
     if _embedder is None or _model_name != name:
         try:
+            import torch
             from sentence_transformers import SentenceTransformer
-            _embedder = SentenceTransformer(name)
+            _configure_threads(torch)
+            if torch.cuda.is_available():
+                # fp16 on GPU: half the memory traffic; outputs are upcast to float32 in embed()
+                _embedder = SentenceTransformer(name, device="cuda").half()
+            else:
+                _embedder = SentenceTransformer(name, device="cpu")
+            _embedder.eval()
             _model_name = name
         except Exception as e:
             raise RuntimeError(f"Failed to load embedding model {name}: {e}") from e
     return _embedder
 
 
+def get_embedding_model_name(model_name: str = "") -> str:
+    """Return the model embed() uses for the given (or default) model name (e.g. for keying on-disk caches)."""
+    return model_name or _DEFAULT_MODEL
+
+
 def get_embedding_dimension(model_name: str = "") -> int:
     """Return embedding dimension for the given (or default) model."""
     m = get_embedder(model_name)
@@ -43,8 +95,44 @@ def embed(text: Union[str, List[str]], model_name: str = "") -> Union[List[float
         single = False
     if not texts:
         return [] if not single else []
-    model = get_embedder(model_name)
-    vecs = model.encode(texts, convert_to_numpy=True)
+    name = model_name or _DEFAULT_MODEL
+    keys = [_cache_key(name, t) for t in texts]
+    found: Dict[Tuple[str, bytes], np.ndarray] = {}
+    cache_size = embedding_cache_size()
+    if cache_size > 0:
+        with _cache_lock:
+            for key in keys:
+                vec = _cache.get(key)
+                if vec is not None:
+                    _cache.move_to_end(key)
+                    found[key] = vec
+    # Encode each distinct missing text once
+    missing: Dict[Tuple[str, bytes], str] = {}
+    for key, t in zip(keys, texts):
+        if key not in found and key not in missing:
+            missing[key] = t
+    if missing:
+        import torch
+        model = get_embedder(model_name)
+        # encode() already sorts inputs by length internally, so larger batches add little padding
+        with torch.inference_mode():
+            vecs = model.encode(
+                list(missing.values()),
+                convert_to_numpy=True,
+                batch_size=_ENCODE_BATCH_SIZE,
+                show_progress_bar=False,
+                normalize_embeddings=False,
+            )
+        vecs = np.asarray(vecs, dtype=np.float32)
+        found.update(zip(missing.keys(), vecs))
+        if cache_size > 0:
+            with _cache_lock:
+                for key in missing:
+                    # Own copy, not a row view: a view would keep the whole encode batch alive while any row is cached
+                    _cache[key] = found[key].copy()
+                    _cache.move_to_end(key)
+                while len(_cache) > cache_size:
+                    _cache.popitem(last=False)
     if single:
-        return vecs[0].tolist()
-    return [v.tolist() for v in vecs]
+        return found[keys[0]].tolist()
+    return [found[key].tolist() for key in keys]
@@ -1,4 +1,6 @@
 """Run CortexOS API server. Load .env before anything else."""
+import importlib.util
+import os
 from pathlib import Path
 try:
     from dotenv import load_dotenv
@@ -6,12 +8,24 @@ try:
 except ImportError:
     pass
 import uvicorn
-from cortex.utils.config import API_HOST, API_PORT
+from cortex.utils.config import api_host, api_port
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
 
 if __name__ == "__main__":
+    # Dev default: auto-reload, single worker. Production: CORTEX_API_RELOAD=0 and CORTEX_API_WORKERS=<cores>
+    reload = os.environ.get("CORTEX_API_RELOAD", "1") == "1"
+    workers = int(os.environ.get("CORTEX_API_WORKERS", "1"))
     uvicorn.run(
         "cortex.api.server:app",
-        host=API_HOST,
-        port=API_PORT,
-        reload=True,
+        host=api_host(),
+        port=api_port(),
+        reload=reload,
+        workers=None if reload else workers,
+        # libuv event loop + C HTTP parser when installed (uvicorn[standard]); stdlib asyncio/h11 otherwise
+        loop="uvloop" if _available("uvloop") else "asyncio",
+        http="httptools" if _available("httptools") else "h11",
     )
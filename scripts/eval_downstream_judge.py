@@ -7,6 +7,7 @@ Requires OPENAI_API_KEY. Output: average judge score over held-out set.
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import os
 import sys
@@ -23,19 +24,20 @@ except Exception:
 
 def _build_context(memories: list) -> str:
     """Format memories as context string."""
-    return "\n".join(f"- {getattr(m, 'summary', m) if hasattr(m, 'summary') else m}" for m in memories)
+    return "\n".join(f"- {getattr(m, 'summary', m)}" for m in memories)
 
 
-def _get_answer(query: str, context: str, model: str) -> str:
-    """Call LLM to answer query given context."""
+_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+_CONCURRENCY = 20
+
+
+async def _get_answer(query: str, context: str, model: str, client) -> str:
+    """Call LLM to answer query given context. client: shared httpx.AsyncClient (None when no API key)."""
     try:
-        import httpx
-        key = os.environ.get("OPENAI_API_KEY")
-        if not key:
+        if client is None:
             return ""
-        resp = httpx.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers={"Authorization": f"Bearer {key}", "Content-Type": "application/json"},
+        resp = await client.post(
+            _CHAT_URL,
             json={
                 "model": model,
                 "messages": [
@@ -44,7 +46,6 @@ def _get_answer(query: str, context: str, model: str) -> str:
                 ],
                 "max_tokens": 300,
             },
-            timeout=30,
         )
         if resp.status_code != 200:
             return ""
@@ -54,20 +55,17 @@ def _get_answer(query: str, context: str, model: str) -> str:
         return ""
 
 
-def _judge(query: str, context: str, answer: str, model: str) -> float:
+async def _judge(query: str, context: str, answer: str, model: str, client) -> float:
     """LLM judge: Did the answer correctly use the provided memories? Return 0-1."""
     try:
-        import httpx
-        key = os.environ.get("OPENAI_API_KEY")
-        if not key or not answer:
+        if client is None or not answer:
             return 0.5
         prompt = (
             f"Query: {query}\n\nRelevant memories:\n{context}\n\nAnswer: {answer}\n\n"
             "Did the answer correctly use the provided memories? Reply with a number 0 (no) to 1 (yes)."
         )
-        resp = httpx.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers={"Authorization": f"Bearer {key}", "Content-Type": "application/json"},
+        resp = await client.post(
+            _CHAT_URL,
             json={
                 "model": model,
                 "messages": [{"role": "user", "content": prompt}],
@@ -105,12 +103,12 @@ def main() -> int:
     # Load retrieval pipeline in-process to get top-k for each query
     import psycopg2
     from pgvector.psycopg2 import register_vector
-    from cortex.utils.config import DATABASE_URL
+    from cortex.utils.config import database_url
     from cortex.memory.store import MemoryStore
     from cortex.memory.vector_index import VectorIndex
     from cortex.retrieval.retrieval_pipeline import retrieve_with_hybrid
 
-    conn = psycopg2.connect(DATABASE_URL)
+    conn = psycopg2.connect(database_url())
     register_vector(conn)
     store = MemoryStore(db_connection=conn)
     vector_index = VectorIndex(db_connection=conn)
@@ -125,8 +123,8 @@ def main() -> int:
         pass
     try:
         from cortex.graph.graph_store import GraphStore
-        from cortex.utils.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
-        graph_store = GraphStore(uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD)
+        from cortex.utils.config import neo4j_uri, neo4j_user, neo4j_password
+        graph_store = GraphStore(uri=neo4j_uri(), user=neo4j_user(), password=neo4j_password())
     except Exception:
         pass
     try:
@@ -138,26 +136,51 @@ def main() -> int:
     except Exception:
         pass
 
-    scores = []
-    for q in queries:
+    # Embed every distinct query in one batched encoder pass; retrieval then skips its per-query embed
+    from cortex.utils.embeddings import embed
+    texts = list(dict.fromkeys(q["query"] for q in queries if q.get("query")))
+    query_vecs = dict(zip(texts, embed(texts))) if texts else {}
+
+    async def process(q: dict, sem: asyncio.Semaphore, client) -> float | None:
         query = q.get("query", "")
         user_id = q.get("user_id")
         if not query:
-            continue
+            return None
         uid = UUID(user_id) if user_id else None
+        async with sem:
+            # Retrieval is sync (psycopg2/Neo4j); run it in a worker thread so LLM calls keep overlapping
+            try:
+                candidates = await asyncio.to_thread(
+                    retrieve_with_hybrid,
+                    query, uid, vector_index, store,
+                    bm25_index=bm25_index, graph_store=graph_store, mvn_model=mvn_model,
+                    k=args.k, query_embedding=query_vecs.get(query),
+                )
+                memories = [c.memory for c in candidates]
+            except Exception:
+                memories = []
+            context = _build_context(memories)
+            answer = await _get_answer(query, context, args.model, client)
+            return await _judge(query, context, answer, args.model, client)
+
+    async def run_all() -> list:
+        # One keep-alive HTTP/2 client shared by all answer + judge calls; at most _CONCURRENCY queries in flight
+        import httpx
+        key = os.environ.get("OPENAI_API_KEY")
+        client = httpx.AsyncClient(
+            http2=True,
+            headers={"Authorization": f"Bearer {key}", "Content-Type": "application/json"},
+            timeout=30,
+        ) if key else None
+        sem = asyncio.Semaphore(_CONCURRENCY)
         try:
-            candidates = retrieve_with_hybrid(
-                query, uid, vector_index, store,
-                bm25_index=bm25_index, graph_store=graph_store, mvn_model=mvn_model,
-                k=args.k,
-            )
-            memories = [c.memory for c in candidates]
-        except Exception:
-            memories = []
-        context = _build_context(memories)
-        answer = _get_answer(query, context, args.model)
-        score = _judge(query, context, answer, args.model)
-        scores.append(score)
+            results = await asyncio.gather(*(process(q, sem, client) for q in queries))
+        finally:
+            if client is not None:
+                await client.aclose()
+        return [r for r in results if r is not None]
+
+    scores = asyncio.run(run_all())
 
     conn.close()
     if graph_store:
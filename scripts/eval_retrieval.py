@@ -20,9 +20,6 @@ try:
 except Exception:
     pass
 
-from cortex.training.benchmark import recall_at_k, mrr
-from cortex.retrieval.retrieval_pipeline import retrieve_with_hybrid
-
 
 def main() -> int:
     parser = argparse.ArgumentParser()
@@ -33,6 +30,10 @@ def main() -> int:
     parser.add_argument("--k", type=int, default=10)
     args = parser.parse_args()
 
+    # Heavy imports (torch via MVN, sentence-transformers, psycopg2) only after argparse, so --help stays fast
+    from cortex.training.benchmark import recall_at_k, mrr
+    from cortex.retrieval.retrieval_pipeline import retrieve_with_hybrid
+
     data = json.loads(args.queries_file.read_text())
     queries = data.get("queries", data) if isinstance(data, dict) else data
     if not queries:
@@ -41,11 +42,11 @@ def main() -> int:
 
     import psycopg2
     from pgvector.psycopg2 import register_vector
-    from cortex.utils.config import DATABASE_URL
+    from cortex.utils.config import database_url
     from cortex.memory.store import MemoryStore
     from cortex.memory.vector_index import VectorIndex
 
-    conn = psycopg2.connect(DATABASE_URL)
+    conn = psycopg2.connect(database_url())
     register_vector(conn)
     store = MemoryStore(db_connection=conn)
     vector_index = VectorIndex(db_connection=conn)
@@ -61,8 +62,8 @@ def main() -> int:
     graph_store = None
     try:
         from cortex.graph.graph_store import GraphStore
-        from cortex.utils.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
-        graph_store = GraphStore(uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD)
+        from cortex.utils.config import neo4j_uri, neo4j_user, neo4j_password
+        graph_store = GraphStore(uri=neo4j_uri(), user=neo4j_user(), password=neo4j_password())
     except Exception:
         pass
     mvn_model = None
@@ -76,6 +77,11 @@ def main() -> int:
     except Exception:
         pass
 
+    # Embed every distinct query in one batched encoder pass; retrieval then skips its per-query embed
+    from cortex.utils.embeddings import embed
+    texts = list(dict.fromkeys(q["query"] for q in queries if q.get("query")))
+    query_vecs = dict(zip(texts, embed(texts))) if texts else {}
+
     recall5_sum, recall10_sum, mrr_sum = 0.0, 0.0, 0.0
     n = len(queries)
     for q in queries:
@@ -89,9 +95,9 @@ def main() -> int:
             candidates = retrieve_with_hybrid(
                 query, uid, vector_index, store,
                 bm25_index=bm25_index, graph_store=graph_store, mvn_model=mvn_model,
-                k=args.k,
+                k=args.k, query_embedding=query_vecs.get(query),
             )
-            retrieved = [str(c.memory.id) for c in candidates]
+            retrieved = [c.memory.id_str for c in candidates]
         except Exception as e:
             print(f"Query failed: {query[:50]}... -> {e}")
             retrieved = []
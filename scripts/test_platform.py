@@ -7,6 +7,9 @@ Usage: python scripts/test_platform.py [--base-url http://localhost:8000]
 from __future__ import annotations
 
 import argparse
+import asyncio
+import importlib.util
+import json
 import os
 import sys
 import time
@@ -22,10 +25,49 @@ except Exception:
 
 import httpx
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Largest concurrent batch below (the adds / query+timeline+graph); warmup opens this many pooled connections
+_BATCH_WIDTH = 3
 DEFAULT_BASE = os.environ.get("CORTEX_TEST_BASE_URL", "http://localhost:8000")
 TEST_USER = os.environ.get("CORTEX_TEST_USER", "550e8400-e29b-41d4-a716-446655440000")
 
 
+def _jpost(client: httpx.AsyncClient, url: str, body: dict):
+    """POST a JSON body pre-encoded with orjson when installed (C encoder), else stdlib json."""
+    content = orjson.dumps(body) if orjson is not None else json.dumps(body).encode()
+    return client.post(url, content=content, headers={"content-type": "application/json"})
+
+
+def _json(r: httpx.Response):
+    """Decode a JSON response body (orjson when installed)."""
+    return orjson.loads(r.content) if orjson is not None else r.json()
+
+
+async def _timed(client: httpx.AsyncClient, method: str, url: str, **kwargs):
+    """Send a request and return (response or exception, latency ms) so concurrent requests keep per-request timings."""
+    t0 = time.perf_counter()
+    try:
+        if method == "POST" and "json" in kwargs:
+            r = await _jpost(client, url, kwargs.pop("json"))
+        else:
+            r = await client.request(method, url, **kwargs)
+    except Exception as e:
+        r = e
+    return r, (time.perf_counter() - t0) * 1000
+
+
+async def _batch(calls: list) -> list:
+    """Await _timed calls concurrently (multiplexed over HTTP/2, or one pooled connection each over HTTP/1.1)."""
+    # TaskGroup (3.11+): structured batch; _timed never raises, so one failed check cannot cancel the others
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(c) for c in calls]
+    return [t.result() for t in tasks]
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Test CortexOS API and report status.")
     parser.add_argument("--base-url", default=DEFAULT_BASE, help="API base URL")
@@ -33,6 +75,10 @@ def main() -> int:
     parser.add_argument("--timeout", type=float, default=30.0, help="Request timeout seconds")
     parser.add_argument("--skip-consolidation", action="store_true", help="Skip consolidation step (use before train_mvn so feedback memory ids still exist)")
     args = parser.parse_args()
+    return asyncio.run(_run(args))
+
+
+async def _run(args: argparse.Namespace) -> int:
     base = args.base_url.rstrip("/")
     user = args.user
     timeout = args.timeout
@@ -40,14 +86,28 @@ def main() -> int:
     results = []
     total_start = time.perf_counter()
 
-    with httpx.Client(base_url=base, timeout=timeout) as client:
+    # HTTP/2 multiplexes every concurrent request over one connection; without it (h2 not installed, or plain http
+    # where httpx does not negotiate h2) concurrent requests each take a pooled keep-alive HTTP/1.1 connection.
+    # retries=0 so a failed connect shows up as a failed check rather than hidden retry latency
+    use_http2 = base.startswith("https://") and importlib.util.find_spec("h2") is not None
+    if use_http2:
+        limits = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60)
+    else:
+        limits = httpx.Limits(max_connections=20, max_keepalive_connections=20, keepalive_expiry=60)
+    transport = httpx.AsyncHTTPTransport(limits=limits, retries=0, http2=use_http2)
+    async with httpx.AsyncClient(base_url=base, timeout=timeout, transport=transport) as client:
+
+        # ---- Connection warmup (untimed: the first round opens _BATCH_WIDTH pooled sockets or the HTTP/2 session,
+        # the second runs on the established connections, so measured latencies below exclude connect cost) ----
+        for _ in range(2):
+            await _batch([_timed(client, "GET", "/health") for _ in range(_BATCH_WIDTH)])
 
         # ---- Health ----
         t0 = time.perf_counter()
         try:
-            r = client.get("/health")
+            r = await client.get("/health")
             r.raise_for_status()
-            data = r.json()
+            data = _json(r)
             ok = data.get("status") == "ok" and data.get("service") == "cortexos"
         except Exception as e:
             ok, data = False, str(e)
@@ -60,7 +120,7 @@ def main() -> int:
 
         # ---- Warmup (ensure embedder loaded so measured adds are steady-state) ----
         try:
-            client.get("/status")
+            await client.get("/status")
         except Exception:
             pass
 
@@ -71,27 +131,39 @@ def main() -> int:
             {"summary": "Meeting with Alex about Q1 roadmap next Tuesday", "entities": ["Alex", "Q1"], "importance": 0.9},
         ]
         added_ids = []
-        for i, body in enumerate(memories_to_add):
-            t0 = time.perf_counter()
+        responses = await _batch(
+            [_timed(client, "POST", f"/memory/add?user={user}", json=b) for b in memories_to_add]
+        )
+        for body, (r, elapsed) in zip(memories_to_add, responses):
             try:
-                r = client.post(f"/memory/add?user={user}", json=body)
+                if isinstance(r, Exception):
+                    raise r
                 r.raise_for_status()
-                data = r.json()
+                data = _json(r)
                 added_ids.append(data.get("id"))
                 ok = "id" in data and data.get("summary") == body["summary"]
             except Exception as e:
                 ok, data = False, str(e)
-            elapsed = (time.perf_counter() - t0) * 1000
             results.append((f"POST /memory/add ({body['summary'][:30]}...)", ok, elapsed, data if ok else {"error": str(data)}))
 
-        # ---- Query ----
+        # ---- Query, timeline, graph: independent reads once the adds are in, so they run concurrently ----
         query_text = "launch beta"
         retrieved_ids = []
-        t0 = time.perf_counter()
+        (r_query, t_query), (r_timeline, t_timeline), (r_graph, t_graph) = await _batch(
+            [
+                _timed(client, "GET", f"/memory/query?q=launch+beta&user={user}&k=5"),
+                _timed(client, "GET", f"/memory/timeline?user={user}"),
+                # Graph is optional: may be empty if no graph or no node
+                _timed(client, "GET", "/memory/graph?node=beta&depth=2"),
+            ]
+        )
+
+        # ---- Query ----
         try:
-            r = client.get(f"/memory/query?q=launch+beta&user={user}&k=5")
-            r.raise_for_status()
-            data = r.json()
+            if isinstance(r_query, Exception):
+                raise r_query
+            r_query.raise_for_status()
+            data = _json(r_query)
             ok = isinstance(data, list) and len(data) >= 1
             if ok and data:
                 first = data[0]
@@ -99,32 +171,19 @@ def main() -> int:
                 retrieved_ids = [item.get("id") for item in data if item.get("id")]
         except Exception as e:
             ok, data = False, str(e)
-        elapsed = (time.perf_counter() - t0) * 1000
-        results.append(("GET /memory/query (launch beta)", ok, elapsed, len(data) if isinstance(data, list) else data))
-
-        # ---- Timeline ----
-        t0 = time.perf_counter()
-        try:
-            r = client.get(f"/memory/timeline?user={user}")
-            r.raise_for_status()
-            data = r.json()
-            ok = isinstance(data, list)
-        except Exception as e:
-            ok, data = False, str(e)
-        elapsed = (time.perf_counter() - t0) * 1000
-        results.append(("GET /memory/timeline", ok, elapsed, len(data) if isinstance(data, list) else data))
+        results.append(("GET /memory/query (launch beta)", ok, t_query, len(data) if isinstance(data, list) else data))
 
-        # ---- Graph (optional: may be empty if no graph or no node) ----
-        t0 = time.perf_counter()
-        try:
-            r = client.get("/memory/graph?node=beta&depth=2")
-            r.raise_for_status()
-            data = r.json()
-            ok = isinstance(data, list)
-        except Exception as e:
-            ok, data = False, str(e)
-        elapsed = (time.perf_counter() - t0) * 1000
-        results.append(("GET /memory/graph (node=beta)", ok, elapsed, len(data) if isinstance(data, list) else data))
+        # ---- Timeline / Graph ----
+        for name, r, elapsed in (("GET /memory/timeline", r_timeline, t_timeline), ("GET /memory/graph (node=beta)", r_graph, t_graph)):
+            try:
+                if isinstance(r, Exception):
+                    raise r
+                r.raise_for_status()
+                data = _json(r)
+                ok = isinstance(data, list)
+            except Exception as e:
+                ok, data = False, str(e)
+            results.append((name, ok, elapsed, len(data) if isinstance(data, list) else data))
 
         # ---- Feedback (include query + retrieved_memory_ids so MVN training can build samples) ----
         feedback_body = {
@@ -136,9 +195,9 @@ def main() -> int:
         }
         t0 = time.perf_counter()
         try:
-            r = client.post("/memory/feedback", json=feedback_body)
+            r = await _jpost(client, "/memory/feedback", feedback_body)
             r.raise_for_status()
-            data = r.json()
+            data = _json(r)
             ok = data.get("ok") is True
         except Exception as e:
             ok, data = False, str(e)
@@ -149,10 +208,10 @@ def main() -> int:
         if not args.skip_consolidation:
             t0 = time.perf_counter()
             try:
-                r = client.post(f"/consolidate/run?user={user}")
+                r = await client.post(f"/consolidate/run?user={user}")
                 r.raise_for_status()
                 ok = True
-                data = r.json() if r.content else {}
+                data = _json(r) if r.content else {}
             except Exception as e:
                 ok, data = False, str(e)
             elapsed = (time.perf_counter() - t0) * 1000
@@ -162,9 +221,9 @@ def main() -> int:
 
         # ---- Status (component health) ----
         try:
-            r = client.get("/status")
+            r = await client.get("/status")
             r.raise_for_status()
-            status_data = r.json()
+            status_data = _json(r)
         except Exception:
             status_data = {}
 
@@ -7,6 +7,7 @@ Usage: python scripts/train_mvn.py [--limit 5000] [--save path] [--epochs 10]
 from __future__ import annotations
 
 import argparse
+import json
 import os
 import sys
 from pathlib import Path
@@ -20,47 +21,117 @@ try:
 except Exception:
     pass
 
-import random
-import psycopg2
-from cortex.memory.store import MemoryStore
-from cortex.training.mvn_dataset import MVNDataset
-from cortex.training.mvn_train import train_mvn
-from cortex.ranking.mvn_features import build_mvn_features, build_mvn_feature_dim
-from cortex.retrieval.intent import detect_intent_simple
-from cortex.utils.config import DATABASE_URL
-
-INTENT_IDS = {"recall": 0, "reasoning": 1, "personal": 2, "knowledge": 3, "planning": 4}
+from itertools import islice
+from typing import TYPE_CHECKING, Optional
 
+import numpy as np
 
-def build_synthetic_samples(store: MemoryStore, min_samples: int = 20, max_memories: int = 200) -> list:
-    """Build (pos_features, neg_features) from store when feedback log ids don't resolve. Uses each memory as a query proxy; positive = self, negatives = random others."""
+from cortex.memory.schema import Memory
+from cortex.ranking.mvn_features import build_mvn_features, build_mvn_feature_dim
+from cortex.retrieval.intent import detect_intent_id
+from cortex.utils.embeddings import embed, get_embedding_model_name
+
+if TYPE_CHECKING:
+    from cortex.memory.store import MemoryStore
+
+_LOG_CHUNK = 1000  # feedback logs per server-side fetch / bulk memory lookup
+_SYNTHETIC_CACHE_VERSION = 2  # bump when the .npz layout or how emb/q_emb are derived changes
+
+
+def _log_memory_ids(logs: list) -> set:
+    """UUIDs of all retrieved/used memories referenced by logs (malformed ids skipped)."""
+    ids = set()
+    for log in logs:
+        for mid in (log.get("retrieved_memory_ids") or []) + (log.get("used_memory_ids") or []):
+            try:
+                ids.add(UUID(str(mid)))
+            except ValueError:
+                continue
+    return ids
+
+
+def _synthetic_pool(store: MemoryStore, cache_path: Optional[Path] = None) -> tuple:
+    """
+    Candidate memories for synthetic samples plus L2-normalized memory and query-proxy embeddings:
+    (memories, queries, emb (N, D), q_emb (N, D)). Cached in cache_path (.npz) keyed by cache version, embedding model and
+    store.embeddings_signature(), so repeat runs on an unchanged corpus skip the per-user Postgres reads, vector decoding and query embedding.
+    Each memory's .embedding is set to its (normalized) float32 row of emb.
+    """
+    sig = f"v{_SYNTHETIC_CACHE_VERSION}|{get_embedding_model_name()}|{store.embeddings_signature()}" if cache_path else None
+    if cache_path and cache_path.exists():
+        try:
+            with np.load(cache_path) as data:
+                if str(data["sig"]) == sig:
+                    memories = [Memory.model_validate(d) for d in json.loads(data["memories"].tobytes())]
+                    emb = data["emb"]
+                    for m, row in zip(memories, emb):
+                        m.embedding = row
+                    return memories, [str(q) for q in data["queries"]], emb, data["q_emb"]
+        except Exception as e:
+            print(f"Ignoring unreadable synthetic cache {cache_path}: {e}")
     memories = []
     for uid in store.get_user_ids(limit=20):
         memories.extend(store.get_user_memories(uid, limit=50))
     seen = {m.id: m for m in memories}
-    memories = [m for m in seen.values() if getattr(m, "embedding", None) and len(m.embedding) > 0]
+    memories = [m for m in seen.values() if getattr(m, "embedding", None) is not None and len(m.embedding) > 0]
     if len(memories) < 2:
+        return [], [], None, None
+    # One batched embed of the query proxies; memories whose vector dim differs from the embedder's are dropped
+    queries = [(m.summary or "")[:200] for m in memories]
+    q_emb = np.asarray(embed(queries), dtype=np.float32)
+    keep = [i for i, m in enumerate(memories) if len(m.embedding) == q_emb.shape[1]]
+    memories, queries, q_emb = [memories[i] for i in keep], [queries[i] for i in keep], q_emb[keep]
+    emb = np.stack([np.asarray(m.embedding, dtype=np.float32) for m in memories]) if memories else q_emb
+    emb /= np.maximum(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12)
+    q_emb /= np.maximum(np.linalg.norm(q_emb, axis=1, keepdims=True), 1e-12)
+    # Point each memory at its float32 row (a view, no copy) and drop the decoded Python float list
+    for m, row in zip(memories, emb):
+        m.embedding = row
+    if cache_path and len(memories) >= 2:
+        blob = json.dumps([m.model_dump(mode="json", exclude={"embedding"}) for m in memories]).encode()
+        tmp = cache_path.with_name(cache_path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, sig=np.array(sig), memories=np.frombuffer(blob, dtype=np.uint8),
+                     queries=np.array(queries), emb=emb, q_emb=q_emb)
+        os.replace(tmp, cache_path)
+    return memories, queries, emb, q_emb
+
+
+def build_synthetic_samples(
+    store: MemoryStore,
+    min_samples: int = 20,
+    max_memories: int = 200,
+    cache_path: Optional[Path] = None,
+    rng: Optional[np.random.Generator] = None,
+) -> list:
+    """Build (pos_features, neg_features) from store when feedback log ids don't resolve. Uses each memory as a query proxy; positive = self, negatives = random others."""
+    rng = rng or np.random.default_rng()
+    memories, queries, emb, q_emb = _synthetic_pool(store, cache_path)
+    if len(memories) < 2:
+        return []
+    # Cheap precheck before any feature building: a usable row needs a summary (the query proxy) and a nonzero vector
+    valid = np.fromiter((bool(q.strip()) for q in queries), dtype=bool, count=len(queries)) & emb.any(axis=1)
+    if valid.sum() < 2:
         return []
-    random.shuffle(memories)
-    memories = memories[:max_memories]
+    # Random subset of the valid rows; all query-vs-memory cosines at once as one (N, N) matmul of L2-normalized rows
+    order = rng.permutation(np.flatnonzero(valid))[:max_memories]
+    memories, queries = [memories[i] for i in order], [queries[i] for i in order]
+    sims = (q_emb[order] @ emb[order].T).tolist()
+    n = len(memories)
+    n_neg = min(5, n - 1)
     samples = []
-    for m in memories:
-        others = [x for x in memories if x.id != m.id]
-        if not others:
-            continue
-        query = (m.summary or "")[:200]
-        intent_id = INTENT_IDS.get(detect_intent_simple(query), 0)
-        pos_feats = build_mvn_features(query, memory=m, intent_type=intent_id)
-        if not pos_feats:
-            continue
-        negs = random.sample(others, min(5, len(others)))
-        neg_feats = []
-        for n in negs:
-            f = build_mvn_features(query, memory=n, intent_type=intent_id)
-            if f:
-                neg_feats.append(f)
-        if neg_feats:
-            samples.append({"pos_features": pos_feats, "neg_features": neg_feats})
+    for i, m in enumerate(memories):
+        query = queries[i]
+        intent_id = detect_intent_id(query)
+        pos_feats = build_mvn_features(query, memory=m, intent_type=intent_id, similarity=sims[i][i])
+        # Distinct negatives != i without building an "others" list: draw from n-1 slots and skip over i
+        negs = rng.choice(n - 1, size=n_neg, replace=False)
+        negs[negs >= i] += 1
+        neg_feats = [
+            build_mvn_features(query, memory=memories[j], intent_type=intent_id, similarity=sims[i][j])
+            for j in negs.tolist()
+        ]
+        samples.append({"pos_features": pos_feats, "neg_features": neg_feats})
         if len(samples) >= min_samples:
             break
     return samples
@@ -76,50 +147,71 @@ def main() -> int:
     parser.add_argument("--verbose", "-v", action="store_true", help="Print first log entry and resolve check")
     args = parser.parse_args()
 
+    # Heavy imports (psycopg2, torch) only after argparse, so --help stays fast
+    import psycopg2
+    from cortex.memory.store import MemoryStore
+    from cortex.training.mvn_dataset import MVNDataset
+    from cortex.training.mvn_train import MVNTrainDataset, train_mvn
+    from cortex.utils.config import database_url
+
     save_path = args.save or os.environ.get("CORTEX_MVN_CHECKPOINT") or "checkpoints/mvn.pt"
     save_path = Path(save_path)
     save_path.parent.mkdir(parents=True, exist_ok=True)
 
-    conn = psycopg2.connect(DATABASE_URL)
+    conn = psycopg2.connect(database_url())
     store = MemoryStore(db_connection=conn)
 
-    logs = store.get_feedback_logs(limit=args.limit)
+    # Memories referenced by the current chunk of logs, fetched in one query per chunk (not one get_memory per id)
+    mem_by_id: dict = {}
 
     def get_memory_fn(memory_id):
         try:
             mid = str(memory_id) if memory_id is not None else None
             if not mid:
                 return None
-            return store.get_memory(UUID(mid))
+            return mem_by_id.get(str(UUID(mid)))
         except Exception:
             return None
 
-    if args.verbose and logs:
-        first = logs[0]
-        print(f"First log: query={first.get('query', '')[:50]!r}, retrieved_count={len(first.get('retrieved_memory_ids') or [])}, used_count={len(first.get('used_memory_ids') or [])}")
-        pos_id = (first.get("used_memory_ids") or first.get("retrieved_memory_ids") or [None])[0]
-        if pos_id is not None:
-            mem = get_memory_fn(pos_id)
-            print(f"  get_memory({pos_id!r}) -> {'OK' if mem else 'None'}")
-
+    # Stream logs from a server-side cursor and build samples chunk by chunk, so only one chunk of logs is held at once
+    dataset = MVNDataset()
     train_samples = []
-    if logs:
-        dataset = MVNDataset()
-        build_entries = list(dataset.build(logs))
-        if build_entries:
-            train_samples = dataset.build_feature_samples(logs, get_memory_fn=get_memory_fn)
+    log_iter = store.iter_feedback_logs(limit=args.limit, itersize=_LOG_CHUNK)
+    first_chunk = True
+    while True:
+        logs = list(islice(log_iter, _LOG_CHUNK))
+        if not logs:
+            break
+        mem_by_id.clear()
+        mem_by_id.update((m.id_str, m) for m in store.get_memories_bulk(_log_memory_ids(logs)))
+        if args.verbose and first_chunk:
+            first = logs[0]
+            print(f"First log: query={first.get('query', '')[:50]!r}, retrieved_count={len(first.get('retrieved_memory_ids') or [])}, used_count={len(first.get('used_memory_ids') or [])}")
+            pos_id = (first.get("used_memory_ids") or first.get("retrieved_memory_ids") or [None])[0]
+            if pos_id is not None:
+                mem = get_memory_fn(pos_id)
+                print(f"  get_memory({pos_id!r}) -> {'OK' if mem else 'None'}")
+        first_chunk = False
+        # Peek one entry instead of materializing the whole generator just to test for emptiness
+        if next(iter(dataset.build(logs)), None) is not None:
+            train_samples.extend(dataset.build_feature_samples(logs, get_memory_fn=get_memory_fn))
+    mem_by_id.clear()
     if not train_samples:
         print("Using synthetic training data from memories in store (feedback log empty or ids did not resolve).")
-        train_samples = build_synthetic_samples(store, min_samples=15, max_memories=150)
+        train_samples = build_synthetic_samples(
+            store, min_samples=15, max_memories=150, cache_path=save_path.parent / ".mvn_cache.npz"
+        )
     if not train_samples:
         print("No valid training samples and no memories with embeddings in store. Add memories then re-run.")
         conn.close()
         return 0
 
-    print(f"Training MVN on {len(train_samples)} samples.")
+    # Convert feature lists to stacked tensors once, then drop the Python lists; training only indexes tensors
+    train_set = MVNTrainDataset(train_samples, build_mvn_feature_dim())
+    del train_samples
+    print(f"Training MVN on {len(train_set)} samples.")
     model = train_mvn(
-        train_samples,
-        feature_dim=build_mvn_feature_dim(),
+        train_set,
         epochs=args.epochs,
         batch_size=args.batch_size,
         margin=args.margin,
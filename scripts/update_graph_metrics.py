@@ -2,10 +2,11 @@
 """Populate graph_metrics cache (pagerank, degree) from Neo4j. Run after consolidation or on a schedule."""
 from __future__ import annotations
 
+import argparse
 import os
 import sys
+import time
 from pathlib import Path
-from uuid import UUID
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 try:
@@ -16,28 +17,53 @@ except Exception:
 
 import psycopg2
 from cortex.graph.graph_store import GraphStore
-from cortex.graph.metrics import compute_graph_metrics
+from cortex.graph.metrics import write_graph_metrics
 from cortex.memory.store import MemoryStore
-from cortex.utils.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, DATABASE_URL
+from cortex.utils.config import neo4j_uri, neo4j_user, neo4j_password, database_url
+
+
+def run_once(graph_store: GraphStore, store: MemoryStore) -> int:
+    """Stream metrics from Neo4j and upsert them in chunks; returns the number of memories updated."""
+    n = write_graph_metrics(graph_store, store)
+    if not n:
+        print("No Memory nodes in graph; nothing to update.")
+        return 0
+    print(f"Updated graph_metrics for {n} memories.")
+    return n
 
 
 def main() -> int:
-    graph_store = GraphStore(uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD)
-    conn = psycopg2.connect(DATABASE_URL)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--interval", type=float, default=0, help="Seconds between runs; 0 = run once and exit")
+    args = parser.parse_args()
+
+    # Keep a small warm Bolt pool so repeated runs (--interval) reuse connections
+    graph_store = GraphStore(
+        uri=neo4j_uri(),
+        user=neo4j_user(),
+        password=neo4j_password(),
+        max_connection_pool_size=10,
+        connection_acquisition_timeout=5,
+        keep_alive=True,
+    )
+    conn = psycopg2.connect(database_url())
     store = MemoryStore(db_connection=conn)
     try:
-        metrics = compute_graph_metrics(graph_store)
-        if not metrics:
-            print("No Memory nodes in graph; nothing to update.")
+        if args.interval <= 0:
+            run_once(graph_store, store)
             return 0
-        # Convert str keys to UUID for store
-        by_uuid = {UUID(mid): v for mid, v in metrics.items()}
-        store.set_graph_metrics_bulk(by_uuid)
-        print(f"Updated graph_metrics for {len(by_uuid)} memories.")
+        while True:
+            try:
+                run_once(graph_store, store)
+            except Exception as e:
+                conn.rollback()
+                print(f"Graph metrics run failed: {e}", file=sys.stderr)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return 0
     finally:
         graph_store.close()
         conn.close()
-    return 0
 
 
 if __name__ == "__main__":